@@ -1,9 +1,26 @@
-from typing import Generic, TypeVar, Dict, List, Optional
-from abc import ABC, abstractmethod 
+from typing import Generic, TypeVar, Dict, List, Optional, Tuple, Iterable, Iterator, Callable, Set
+from abc import ABC, abstractmethod
+from collections import deque
+from heapq import heapify, heappush, heappop
+from enum import Enum
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+import multiprocessing
+import os
+import random
+import time
 
 V = TypeVar('V')
 D = TypeVar('D')
 
+
+# How much constraint propagation backtracking_search does after each assignment
+class Inference(str, Enum):
+    NONE = "none"
+    FORWARD_CHECKING = "forward_checking"
+    # maintained arc consistency: AC-3 from the constraints of the assigned variable
+    MAC = "mac"
+
+
 # Base class for all constraints
 # Its a abstract base class (ABC) that defines the interface
 class Constraint(Generic[V, D], ABC):
@@ -15,7 +32,233 @@ class Constraint(Generic[V, D], ABC):
     def satisfied(self, assignment: Dict[V, D]) -> bool:
         ...
 
-    
+    # Incremental protocol used by the search engine. check is asked whether variable = value
+    # (already in assignment) is allowed, then assign and unassign report the values the search
+    # accepts and retracts, so a constraint can keep its own state (used values, occupied cells...)
+    # and answer check without rescanning the assignment. reset clears that state before a search.
+    # The defaults keep no state and fall back to satisfied, so plain subclasses keep working.
+    # A stateful constraint serves one search at a time.
+    def check(self, variable: V, value: D, assignment: Dict[V, D]) -> bool:
+        return self.satisfied(assignment)
+
+    def assign(self, variable: V, value: D) -> None:
+        pass
+
+    def unassign(self, variable: V, value: D) -> None:
+        pass
+
+    def reset(self) -> None:
+        pass
+
+    # Used by local search (CSP.min_conflicts), which also reports its moves through assign and
+    # unassign. conflicts is how many violations variable = value takes part in with the values of
+    # the other variables in assignment; neighbors are the variables whose conflicts can change
+    # when variable takes or leaves value. The defaults count one violation when satisfied fails.
+    def conflicts(self, variable: V, value: D, assignment: Dict[V, D]) -> int:
+        assigned = variable in assignment
+        previous = assignment.get(variable)
+        assignment[variable] = value
+        violated = not self.satisfied(assignment)
+        if assigned:
+            assignment[variable] = previous
+        else:
+            del assignment[variable]
+        return 1 if violated else 0
+
+    def neighbors(self, variable: V, value: D) -> Iterable[V]:
+        return self.variables
+
+    # Returns the values of the (unassigned) variable's domain that can still satisfy the constraint.
+    # A binary constraint keeps the values that have a support in the other variable's domain;
+    # wider constraints keep the values consistent with the current assignment.
+    # Subclasses can override it with a stronger or cheaper filter.
+    def revise(self, variable: V, domains: Dict[V, List[D]], assignment: Dict[V, D]) -> List[D]:
+        if len(self.variables) == 2:
+            other: V = self.variables[1] if self.variables[0] == variable else self.variables[0]
+            return [value for value in domains[variable]
+                    if any(self.satisfied({variable: value, other: other_value}) for other_value in domains[other])]
+
+        kept: List[D] = []
+        for value in domains[variable]:
+            assignment[variable] = value
+            if self.satisfied(assignment):
+                kept.append(value)
+        assignment.pop(variable, None)
+        return kept
+
+    # Yields (variable, kept values) for the unassigned variables of the constraint; ac3 and
+    # forward checking prune each domain before the next pair is asked for. By default one revise
+    # per variable; constraints that filter all their variables at once (AllDifferent) override it.
+    def propagate(self, domains: Dict[V, List[D]], assignment: Dict[V, D]) -> Iterator[Tuple[V, List[D]]]:
+        for variable in self.variables:
+            if variable not in assignment:
+                yield variable, self.revise(variable, domains, assignment)
+
+
+# All the variables take different values.
+# Propagation is Regin's filter: a maximum matching between variables and values, then a value
+# is kept only if some maximum matching uses it, which leaves every variable exactly the values
+# that can still be extended to a full set of different values.
+class AllDifferent(Constraint[V, D]):
+
+    def satisfied(self, assignment: Dict[V, D]) -> bool:
+        values = [assignment[variable] for variable in self.variables if variable in assignment]
+        return len(set(values)) == len(values)
+
+    # the variables holding each value
+    def reset(self) -> None:
+        self._holders: Dict[D, Set[V]] = {}
+
+    def check(self, variable: V, value: D, assignment: Dict[V, D]) -> bool:
+        return not self._holders.get(value)
+
+    def assign(self, variable: V, value: D) -> None:
+        self._holders.setdefault(value, set()).add(variable)
+
+    def unassign(self, variable: V, value: D) -> None:
+        self._holders[value].discard(variable)
+
+    def conflicts(self, variable: V, value: D, assignment: Dict[V, D]) -> int:
+        holders = self._holders.get(value, ())
+        return len(holders) - (variable in holders)
+
+    def neighbors(self, variable: V, value: D) -> Iterable[V]:
+        return self._holders.get(value, ())
+
+    def revise(self, variable: V, domains: Dict[V, List[D]], assignment: Dict[V, D]) -> List[D]:
+        for other, kept in self.propagate(domains, assignment):
+            if other == variable:
+                return kept
+        return domains[variable]
+
+    def propagate(self, domains: Dict[V, List[D]], assignment: Dict[V, D]) -> Iterator[Tuple[V, List[D]]]:
+        candidates: Dict[V, List[D]] = {variable: [assignment[variable]] if variable in assignment else domains[variable]
+                                        for variable in self.variables}
+        matched = self._matching(candidates)
+        unassigned = [variable for variable in self.variables if variable not in assignment]
+        if len(matched) < len(self.variables):
+            # no way to give every variable its own value; an empty domain reports the wipeout
+            # even when every variable is already assigned
+            yield (unassigned or self.variables)[0], []
+            return
+
+        owner: Dict[D, V] = {value: variable for variable, value in matched.items()}
+        free_reachable = self._reachable_from_free(candidates, owner, matched)
+        component = self._components(candidates, owner)
+        for variable in unassigned:
+            kept = [value for value in candidates[variable]
+                    if value == matched[variable] or value in free_reachable
+                    or (value in owner and component[owner[value]] == component[variable])]
+            yield variable, kept
+
+    # Maximum matching by breadth-first augmenting paths, seeded with a greedy matching.
+    # Returns variable -> value for the matched variables.
+    def _matching(self, candidates: Dict[V, List[D]]) -> Dict[V, D]:
+        matched: Dict[V, D] = {}
+        owner: Dict[D, V] = {}
+        for variable in self.variables:
+            for value in candidates[variable]:
+                if value not in owner:
+                    matched[variable] = value
+                    owner[value] = variable
+                    break
+
+        for variable in self.variables:
+            if variable in matched:
+                continue
+            # came_from[value] is the variable the search reached value from
+            came_from: Dict[D, V] = {}
+            frontier = deque([variable])
+            free: Optional[D] = None
+            while frontier and free is None:
+                current = frontier.popleft()
+                for value in candidates[current]:
+                    if value in came_from:
+                        continue
+                    came_from[value] = current
+                    if value not in owner:
+                        free = value
+                        break
+                    frontier.append(owner[value])
+            if free is None:
+                return matched
+            value = free
+            while True:
+                current = came_from[value]
+                previous = matched.get(current)
+                matched[current] = value
+                owner[value] = current
+                if current == variable:
+                    break
+                value = previous
+        return matched
+
+    # The alternating graph goes value -> variable along the edges outside the matching and
+    # variable -> value along matched edges. Values reachable from an unmatched value lie on an
+    # even alternating path, so every variable may take them.
+    def _reachable_from_free(self, candidates: Dict[V, List[D]], owner: Dict[D, V], matched: Dict[V, D]) -> Set[D]:
+        takers: Dict[D, List[V]] = {}
+        for variable in self.variables:
+            for value in candidates[variable]:
+                takers.setdefault(value, []).append(variable)
+        reached: Set[D] = {value for value in takers if value not in owner}
+        frontier = deque(reached)
+        while frontier:
+            value = frontier.popleft()
+            for variable in takers[value]:
+                following = matched[variable]
+                if following not in reached:
+                    reached.add(following)
+                    frontier.append(following)
+        return reached
+
+    # Strongly connected components (iterative Tarjan) of the alternating graph collapsed onto
+    # the variables: variable -> variable whenever it can take the value matched to the other one.
+    # A variable and the value matched to a variable of the same component lie on an even
+    # alternating cycle. Returns the component number of every variable.
+    def _components(self, candidates: Dict[V, List[D]], owner: Dict[D, V]) -> Dict[V, int]:
+        successors: Dict[V, List[V]] = {variable: [owner[value] for value in candidates[variable]
+                                                   if value in owner and owner[value] != variable]
+                                        for variable in self.variables}
+        index: Dict[V, int] = {}
+        low: Dict[V, int] = {}
+        on_stack: Set[V] = set()
+        stack: List[V] = []
+        component: Dict[V, int] = {}
+        count = 0
+        for root in self.variables:
+            if root in index:
+                continue
+            work: List[Tuple[V, int]] = [(root, 0)]
+            while work:
+                variable, position = work.pop()
+                if position == 0:
+                    index[variable] = low[variable] = len(index)
+                    stack.append(variable)
+                    on_stack.add(variable)
+                neighbors = successors[variable]
+                while position < len(neighbors) and neighbors[position] in index:
+                    if neighbors[position] in on_stack:
+                        low[variable] = min(low[variable], index[neighbors[position]])
+                    position += 1
+                if position < len(neighbors):
+                    work.append((variable, position + 1))
+                    work.append((neighbors[position], 0))
+                    continue
+                if low[variable] == index[variable]:
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component[member] = count
+                        if member == variable:
+                            break
+                    count += 1
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[variable])
+        return component
+
+
 class CSP(Generic[V, D]):
     def __init__(self, variables:List[V], domains:Dict[V, List[D]]) -> None:
         self.variables: List[V] = variables
@@ -39,24 +282,572 @@ class CSP(Generic[V, D]):
                 return False
         return True
 
+    # The search's version of consistent, through the incremental protocol: variable = value is
+    # in assignment and the constraints have been told about every other assigned variable.
+    def _violated(self, variable: V, value: D, assignment: Dict[V, D]) -> Optional[Constraint[V, D]]:
+        for constraint in self.constraints[variable]:
+            if not constraint.check(variable, value, assignment):
+                return constraint
+        return None
+
+    def _assign(self, variable: V, value: D, assignment: Dict[V, D]) -> None:
+        assignment[variable] = value
+        for constraint in self.constraints[variable]:
+            constraint.assign(variable, value)
+
+    def _unassign(self, variable: V, assignment: Dict[V, D]) -> None:
+        value = assignment.pop(variable)
+        for constraint in self.constraints[variable]:
+            constraint.unassign(variable, value)
+
+    # Domains are never changed in place: a pruned domain is replaced by a new list and the old one
+    # is pushed on the trail, so undoing back to a trail mark restores the domains as they were.
+    # resized, when given, is told the new size of every domain that changes.
+    def _prune(self, domains: Dict[V, List[D]], variable: V, kept: List[D], trail: List[Tuple[V, List[D]]], resized: Optional[Callable[[V, int], None]] = None) -> None:
+        trail.append((variable, domains[variable]))
+        domains[variable] = kept
+        if resized is not None:
+            resized(variable, len(kept))
+
+    def _undo(self, domains: Dict[V, List[D]], trail: List[Tuple[V, List[D]]], mark: int, resized: Optional[Callable[[V, int], None]] = None) -> None:
+        while len(trail) > mark:
+            variable, previous = trail.pop()
+            domains[variable] = previous
+            if resized is not None:
+                resized(variable, len(previous))
+
+    # Min-conflicts local search with a tabu list, for instances too large for backtracking.
+    # Starts from initial (or a greedy assignment) and keeps moving a random conflicted variable to
+    # the value with the fewest conflicts, ties broken at random. A variable may not go back to a
+    # value it left in the last tabu_tenure steps, unless that value has no conflicts. Conflicts are
+    # recomputed only for the neighbors of each move. Every one of the restarts + 1 runs has up to
+    # max_steps steps, and all of them together max_time seconds, checked before every variable of
+    # the greedy start and every move. sample limits the values tried per move (and per variable in
+    # the greedy start) to that many random ones, for big domains; a move whose sample has no
+    # conflict-free value keeps probing random values for one. Without a sample the greedy start
+    # still tries at most GREEDY_START_SAMPLE values per variable, and a start cut short by the
+    # deadline gives the variables it didn't reach random values.
+    # Returns the best assignment found and its number of conflicted variables, 0 for a solution;
+    # backtracking_search(value_order=hinted_order(assignment)) tries its values first.
+    def min_conflicts(self, max_steps: int = 100_000, restarts: int = 0, max_time: Optional[float] = None, tabu_tenure: int = 10, sample: Optional[int] = None, initial: Optional[Dict[V, D]] = None, seed: Optional[int] = None) -> Tuple[Dict[V, D], int]:
+        rng = random.Random(seed)
+        deadline: Optional[float] = None if max_time is None else time.perf_counter() + max_time
+        best: Dict[V, D] = {}
+        best_count: Optional[int] = None
+        for run in range(restarts + 1):
+            assignment, count, timed_out = self._min_conflicts_run(initial if run == 0 else None, max_steps, deadline, tabu_tenure, sample, rng)
+            if best_count is None or count < best_count:
+                best, best_count = assignment, count
+            if best_count == 0 or timed_out:
+                break
+        return best, best_count
+
+    def _conflicts(self, variable: V, value: D, assignment: Dict[V, D]) -> int:
+        return sum(constraint.conflicts(variable, value, assignment) for constraint in self.constraints[variable])
+
+    # With a sample, when none of the sampled values is free of conflicts it draws up to probes
+    # more random values and takes the first one that is.
+    def _least_conflicted(self, variable: V, assignment: Dict[V, D], sample: Optional[int], rng: random.Random, skip: Callable[[D, int], bool], probes: int = 0) -> Optional[D]:
+        domain = self.domains[variable]
+        sampled = sample is not None and sample < len(domain)
+        values: Iterable[D] = rng.sample(domain, sample) if sampled else domain
+        chosen: List[D] = []
+        fewest: Optional[int] = None
+        for value in values:
+            count = self._conflicts(variable, value, assignment)
+            if skip(value, count):
+                continue
+            if fewest is None or count < fewest:
+                chosen, fewest = [value], count
+            elif count == fewest:
+                chosen.append(value)
+        if sampled and fewest != 0:
+            for _ in range(probes):
+                value = rng.choice(domain)
+                if self._conflicts(variable, value, assignment) == 0:
+                    return value
+        return rng.choice(chosen) if chosen else None
+
+    # One run of min_conflicts: returns its best assignment, that one's number of conflicted
+    # variables and whether the deadline passed
+    def _min_conflicts_run(self, initial: Optional[Dict[V, D]], max_steps: int, deadline: Optional[float], tabu_tenure: int, sample: Optional[int], rng: random.Random) -> Tuple[Dict[V, D], int, bool]:
+        for constraint in dict.fromkeys(c for variable in self.variables for c in self.constraints[variable]):
+            constraint.reset()
+        assignment: Dict[V, D] = {}
+        start_sample = GREEDY_START_SAMPLE if sample is None else sample
+        timed_out = False
+        for variable in self.variables:
+            if initial is not None and variable in initial:
+                value = initial[variable]
+            elif timed_out or (deadline is not None and time.perf_counter() > deadline):
+                timed_out = True
+                value = rng.choice(self.domains[variable])
+            else:
+                value = self._least_conflicted(variable, assignment, start_sample, rng, lambda value, count: False)
+            self._assign(variable, value, assignment)
+
+        # the conflicted variables, in a list for random choice and with their positions for removal
+        conflicted: List[V] = []
+        position: Dict[V, int] = {}
+
+        def update(variable: V) -> None:
+            if self._conflicts(variable, assignment[variable], assignment):
+                if variable not in position:
+                    position[variable] = len(conflicted)
+                    conflicted.append(variable)
+            elif variable in position:
+                last = conflicted.pop()
+                index = position.pop(variable)
+                if last != variable:
+                    conflicted[index] = last
+                    position[last] = index
+
+        for variable in self.variables:
+            update(variable)
+
+        # the best assignment is the current one with the moves made since then undone
+        best_count = len(conflicted)
+        since_best: List[Tuple[V, D]] = []
+        tabu: Dict[Tuple[V, D], int] = {}
+        for step in range(max_steps):
+            if not conflicted or timed_out:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                timed_out = True
+                break
+            variable = rng.choice(conflicted)
+            current = assignment[variable]
+            value = self._least_conflicted(variable, assignment, sample, rng,
+                                           lambda value, count: value == current or (count > 0 and tabu.get((variable, value), -1) >= step),
+                                           len(self.domains[variable]))
+            if value is None:
+                continue
+
+            affected: Set[V] = {variable}
+            for constraint in self.constraints[variable]:
+                affected.update(constraint.neighbors(variable, current))
+            self._unassign(variable, assignment)
+            self._assign(variable, value, assignment)
+            for constraint in self.constraints[variable]:
+                affected.update(constraint.neighbors(variable, value))
+            for other in affected:
+                update(other)
+
+            tabu[(variable, current)] = step + tabu_tenure
+            since_best.append((variable, current))
+            if len(conflicted) < best_count:
+                best_count = len(conflicted)
+                since_best.clear()
+
+        best = {variable: assignment[variable] for variable in self.variables}
+        for variable, value in reversed(since_best):
+            best[variable] = value
+        return best, best_count, timed_out
+
+    # Searches on a process pool and returns the first solution any worker finds (not necessarily
+    # the one backtracking_search would return). mode "split" assigns the first variables in every
+    # consistent way and solves each of those subproblems as a separate task; there are many more
+    # tasks than workers, so a worker that finishes early simply takes the next one. mode
+    # "portfolio" runs the same CSP once per entry of configurations (keyword arguments for
+    # backtracking_search, default_portfolio() by default). Either way the other workers are stopped as
+    # soon as a solution comes back. The CSP and the configurations must be picklable.
+    def parallel_search(self, mode: str = "split", workers: Optional[int] = None, tasks_per_worker: int = 8, configurations: Optional[List[Dict]] = None, **options) -> Optional[Dict[V, D]]:
+        if mode not in ("split", "portfolio"):
+            raise ValueError('mode must be "split" or "portfolio"')
+        workers = workers or os.cpu_count() or 1
+        assignment: Optional[Dict[V, D]] = options.pop("assignment", None)
+        if mode == "split":
+            tasks = [(prefix, options) for prefix in self._split(workers * tasks_per_worker, assignment)]
+        else:
+            configurations = default_portfolio() if configurations is None else configurations
+            tasks = [(assignment, configuration) for configuration in configurations]
+            workers = min(workers, len(tasks))
+        if not tasks:
+            return None
+
+        stop = multiprocessing.Event()
+        with ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(self, stop)) as executor:
+            pending: Set[Future] = {executor.submit(_solve_task, prefix, task_options) for prefix, task_options in tasks}
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        solution = future.result()
+                        if solution is not None:
+                            return solution
+                return None
+            finally:
+                stop.set()
+                for future in pending:
+                    future.cancel()
+
+    # Partial assignments of the first variables, one level at a time, until there are at least
+    # count of them. Only prefixes consistent so far are kept.
+    def _split(self, count: int, assignment: Optional[Dict[V, D]]) -> List[Dict[V, D]]:
+        prefixes: List[Dict[V, D]] = [{} if assignment is None else dict(assignment)]
+        for variable in self.variables:
+            if len(prefixes) >= count:
+                break
+            if variable in prefixes[0]:
+                continue
+            extended: List[Dict[V, D]] = []
+            for prefix in prefixes:
+                for value in self.domains[variable]:
+                    candidate = dict(prefix)
+                    candidate[variable] = value
+                    if self.consistent(variable, candidate):
+                        extended.append(candidate)
+            prefixes = extended
+            if not prefixes:
+                break
+        return prefixes
+
+    # Generalised AC-3 over a queue of constraints: revise every unassigned variable of a constraint
+    # and, when its domain shrinks, queue again the constraints on that variable.
+    # Works on self.domains when no domains are given. Returns False if a domain is wiped out.
+    def ac3(self, domains: Optional[Dict[V, List[D]]] = None, assignment: Optional[Dict[V, D]] = None, trail: Optional[List[Tuple[V, List[D]]]] = None, constraints: Optional[Iterable[Constraint[V, D]]] = None) -> bool:
+        domains = self.domains if domains is None else domains
+        assignment = {} if assignment is None else assignment
+        trail = [] if trail is None else trail
+        if constraints is None:
+            constraints = [c for variable in self.variables for c in self.constraints[variable]]
+        return self._ac3(domains, assignment, trail, constraints) is None
+
+    # the propagation helpers return the constraint that wiped out a domain, None if there was no wipeout
+    def _ac3(self, domains: Dict[V, List[D]], assignment: Dict[V, D], trail: List[Tuple[V, List[D]]], constraints: Iterable[Constraint[V, D]], resized: Optional[Callable[[V, int], None]] = None) -> Optional[Constraint[V, D]]:
+        queue = deque(dict.fromkeys(constraints))
+        queued = set(queue)
+
+        while queue:
+            constraint = queue.popleft()
+            queued.discard(constraint)
+            for variable, kept in constraint.propagate(domains, assignment):
+                if not kept:
+                    return constraint
+                if len(kept) == len(domains[variable]):
+                    continue
+                self._prune(domains, variable, kept, trail, resized)
+                for neighbor in self.constraints[variable]:
+                    if neighbor not in queued:
+                        queued.add(neighbor)
+                        queue.append(neighbor)
+        return None
+
+    # One pass of propagate over the unassigned variables sharing a constraint with variable
+    def forward_check(self, variable: V, assignment: Dict[V, D], domains: Dict[V, List[D]], trail: List[Tuple[V, List[D]]]) -> bool:
+        return self._forward_check(variable, assignment, domains, trail) is None
+
+    def _forward_check(self, variable: V, assignment: Dict[V, D], domains: Dict[V, List[D]], trail: List[Tuple[V, List[D]]], resized: Optional[Callable[[V, int], None]] = None) -> Optional[Constraint[V, D]]:
+        for constraint in self.constraints[variable]:
+            for other, kept in constraint.propagate(domains, assignment):
+                if not kept:
+                    return constraint
+                if len(kept) == len(domains[other]):
+                    continue
+                self._prune(domains, other, kept, trail, resized)
+        return None
+
+    def _infer(self, variable: V, assignment: Dict[V, D], domains: Dict[V, List[D]], trail: List[Tuple[V, List[D]]], inference: Inference, resized: Optional[Callable[[V, int], None]] = None) -> Optional[Constraint[V, D]]:
+        if inference == Inference.FORWARD_CHECKING:
+            return self._forward_check(variable, assignment, domains, trail, resized)
+        if inference == Inference.MAC:
+            return self._ac3(domains, assignment, trail, self.constraints[variable], resized)
+        return None
+
     # searchs for a solution on the domain list of the variable.
     # For each solution that attends the constraints, go to the other variable
-    # and repeat the process (recursivily), registering the state of the variables in a dict (the solution of the overall problem)
-    # if the overall solution is not found, recursivily undo the last variable assignment and try another solution on the variable domain
-    def backtracking_search(self, assignment: Dict[V, D] = {}) -> Optional[Dict[V, D]]:
-        if len(assignment) == len(self.variables):
-            return assignment
-        
-        unassigned: List[V] = [v for v in self.variables if v not in assignment.keys()]
-
-        first: V = unassigned[0]
-        for value in self.domains[first]:
-            local_assignment = assignment.copy()
-            local_assignment[first] = value
-            if self.consistent(first, local_assignment):
-                result: Optional[Dict[V, D]] = self.backtracking_search(local_assignment)
-                if result is not None:
-                    return result
+    # and repeat the process, registering the state of the variables in a dict (the solution of the overall problem)
+    # if the overall solution is not found, undo the last variable assignment and try another solution on the variable domain
+    # With an inference other than NONE the domains are made arc consistent first, and narrowed after
+    # every assignment; prunings are undone from the trail when the search backtracks.
+    # variable_order picks the next variable (StaticOrder, the order of self.variables, by default)
+    # and value_order the order its values are tried in (natural_order by default).
+    def backtracking_search(self, assignment: Optional[Dict[V, D]] = None, inference: Inference = Inference.NONE, variable_order: Optional["VariableOrder[V, D]"] = None, value_order: Optional["ValueOrder"] = None) -> Optional[Dict[V, D]]:
+        for solution in self._solutions(assignment, inference, variable_order, value_order):
+            return dict(solution)
         return None
-    
-    
\ No newline at end of file
+
+    # Every solution, found lazily in search order; itertools.islice takes the first k.
+    # Each one is a copy, so it stays valid while the search goes on.
+    def iter_solutions(self, assignment: Optional[Dict[V, D]] = None, inference: Inference = Inference.NONE, variable_order: Optional["VariableOrder[V, D]"] = None, value_order: Optional["ValueOrder"] = None) -> Iterator[Dict[V, D]]:
+        for solution in self._solutions(assignment, inference, variable_order, value_order):
+            yield dict(solution)
+
+    # The number of solutions, without building any of them
+    def count_solutions(self, assignment: Optional[Dict[V, D]] = None, inference: Inference = Inference.NONE, variable_order: Optional["VariableOrder[V, D]"] = None, value_order: Optional["ValueOrder"] = None) -> int:
+        return sum(1 for _ in self._solutions(assignment, inference, variable_order, value_order))
+
+    # The search engine. It is iterative, with an explicit stack of the assigned variables, and
+    # works on a single assignment dict changed in place, so neither the recursion limit nor
+    # per-value copies bound the size of the CSP. Every solution is yielded as that same dict:
+    # it is only valid until the generator is resumed.
+    # stop is polled every STOP_CHECK_INTERVAL steps; the search gives up once it returns True.
+    def _solutions(self, assignment: Optional[Dict[V, D]] = None, inference: Inference = Inference.NONE, variable_order: Optional["VariableOrder[V, D]"] = None, value_order: Optional["ValueOrder"] = None, stop: Optional[Callable[[], bool]] = None) -> Iterator[Dict[V, D]]:
+        inference = Inference(inference)
+        variable_order = StaticOrder() if variable_order is None else variable_order
+        value_order = natural_order if value_order is None else value_order
+        assignment = {} if assignment is None else dict(assignment)
+        # lists are replaced, never mutated, so the CSP's own domain lists can be shared
+        domains: Dict[V, List[D]] = dict(self.domains)
+        for variable, value in assignment.items():
+            domains[variable] = [value]
+        trail: List[Tuple[V, List[D]]] = []
+        if inference != Inference.NONE and not self.ac3(domains, assignment, trail):
+            return
+        variable_order.start(self, [v for v in self.variables if v not in assignment], domains)
+        resized = variable_order.resized
+        for constraint in dict.fromkeys(c for variable in self.variables for c in self.constraints[variable]):
+            constraint.reset()
+        # replay the seed through the constraints, checking each variable against the ones before it
+        seed, assignment = assignment, {}
+        for variable, value in seed.items():
+            assignment[variable] = value
+            for constraint in self.constraints.get(variable, []):
+                if not constraint.check(variable, value, assignment):
+                    return
+            for constraint in self.constraints.get(variable, []):
+                constraint.assign(variable, value)
+
+        # one frame per assigned variable: the variable, its values still to try and the trail
+        # mark to undo to before trying the next one
+        stack: List[Tuple[V, Iterator[D], int]] = []
+        descend = True
+        steps = 0
+        while True:
+            steps += 1
+            if stop is not None and steps % STOP_CHECK_INTERVAL == 0 and stop():
+                return
+            if descend:
+                if len(assignment) == len(self.variables):
+                    yield assignment
+                else:
+                    variable = variable_order.select(domains)
+                    variable_order.assign(variable)
+                    stack.append((variable, iter(value_order(self, variable, domains, assignment)), len(trail)))
+            if not stack:
+                return
+
+            variable, values, mark = stack[-1]
+            if variable in assignment:
+                self._unassign(variable, assignment)
+            self._undo(domains, trail, mark, resized)
+            descend = False
+            for value in values:
+                assignment[variable] = value
+                conflict = self._violated(variable, value, assignment)
+                if conflict is None:
+                    self._assign(variable, value, assignment)
+                    self._prune(domains, variable, [value], trail, resized)
+                    conflict = self._infer(variable, assignment, domains, trail, inference, resized)
+                    if conflict is None:
+                        descend = True
+                        break
+                    self._unassign(variable, assignment)
+                    self._undo(domains, trail, mark, resized)
+                else:
+                    del assignment[variable]
+                variable_order.conflict(conflict)
+            if not descend:
+                stack.pop()
+                variable_order.unassign(variable)
+
+
+# Chooses which variable the search assigns next. The search reports every assignment and undo,
+# and the new size of every domain it prunes or restores, so implementations keep the unassigned
+# variables up to date instead of rescanning the CSP.
+class VariableOrder(Generic[V, D], ABC):
+
+    @abstractmethod
+    def start(self, csp: CSP[V, D], unassigned: List[V], domains: Dict[V, List[D]]) -> None:
+        ...
+
+    @abstractmethod
+    def select(self, domains: Dict[V, List[D]]) -> V:
+        ...
+
+    @abstractmethod
+    def assign(self, variable: V) -> None:
+        ...
+
+    @abstractmethod
+    def unassign(self, variable: V) -> None:
+        ...
+
+    # the domain of variable now holds size values
+    def resized(self, variable: V, size: int) -> None:
+        pass
+
+    # a constraint made the current branch fail
+    def conflict(self, constraint: Constraint[V, D]) -> None:
+        pass
+
+
+# Variables in the order given to the CSP. Backtracking is chronological, so the unassigned
+# variables are always a suffix of that order and select is O(1).
+class StaticOrder(VariableOrder[V, D]):
+
+    def start(self, csp: CSP[V, D], unassigned: List[V], domains: Dict[V, List[D]]) -> None:
+        self._order: List[V] = unassigned
+        self._position: int = 0
+
+    def select(self, domains: Dict[V, List[D]]) -> V:
+        return self._order[self._position]
+
+    def assign(self, variable: V) -> None:
+        self._position += 1
+
+    def unassign(self, variable: V) -> None:
+        self._position -= 1
+
+
+# Minimum remaining values: the unassigned variable with the smallest current domain.
+# With degree=True ties go to the variable constrained with the most other variables.
+# The variables sit in a lazy heap: a variable is pushed again whenever its key changes, and
+# entries that are stale (an old key or an assigned variable) are dropped when they reach the
+# top, so select and every update are O(log n). Other ties go to the CSP's order.
+class MinimumRemainingValues(VariableOrder[V, D]):
+
+    def __init__(self, degree: bool = False) -> None:
+        self._use_degree = degree
+
+    def start(self, csp: CSP[V, D], unassigned: List[V], domains: Dict[V, List[D]]) -> None:
+        self._position: Dict[V, int] = {variable: index for index, variable in enumerate(csp.variables)}
+        self._size: Dict[V, int] = {variable: len(domains[variable]) for variable in csp.variables}
+        self._unassigned: Set[V] = set(unassigned)
+        self._degree: Dict[V, int] = {}
+        if self._use_degree:
+            for variable in unassigned:
+                neighbors: Set[V] = {other for constraint in csp.constraints[variable] for other in constraint.variables}
+                neighbors.discard(variable)
+                self._degree[variable] = len(neighbors)
+        self._rebuild()
+
+    def _key(self, variable: V) -> Tuple:
+        return (self._size[variable], -self._degree.get(variable, 0))
+
+    def _push(self, variable: V) -> None:
+        heappush(self._heap, (self._key(variable), self._position[variable], variable))
+        # keep the stale entries from outgrowing the live ones
+        if len(self._heap) > 2 * len(self._unassigned) + 64:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._heap: List[Tuple[Tuple, int, V]] = [(self._key(v), self._position[v], v) for v in self._unassigned]
+        heapify(self._heap)
+
+    def select(self, domains: Dict[V, List[D]]) -> V:
+        heap = self._heap
+        while True:
+            key, _, variable = heap[0]
+            if variable in self._unassigned and key == self._key(variable):
+                return variable
+            heappop(heap)
+
+    def assign(self, variable: V) -> None:
+        self._unassigned.discard(variable)
+
+    def unassign(self, variable: V) -> None:
+        self._unassigned.add(variable)
+        self._push(variable)
+
+    def resized(self, variable: V, size: int) -> None:
+        self._size[variable] = size
+        if variable in self._unassigned:
+            self._push(variable)
+
+
+# dom/wdeg: every constraint starts with weight 1 and gains 1 each time it causes a failure;
+# the variable with the smallest domain size / sum of the weights of its constraints goes first.
+# The sums are kept per variable, so a failure costs one heap update per variable of the constraint.
+class DomWDeg(MinimumRemainingValues[V, D]):
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def start(self, csp: CSP[V, D], unassigned: List[V], domains: Dict[V, List[D]]) -> None:
+        self._wdeg: Dict[V, int] = {variable: len(csp.constraints[variable]) for variable in csp.variables}
+        super().start(csp, unassigned, domains)
+
+    def _key(self, variable: V) -> Tuple:
+        return (self._size[variable] / max(self._wdeg[variable], 1),)
+
+    def conflict(self, constraint: Constraint[V, D]) -> None:
+        for variable in constraint.variables:
+            self._wdeg[variable] += 1
+            if variable in self._unassigned:
+                self._push(variable)
+
+
+# Value orderings take (csp, variable, domains, assignment) and return the values to try, in order
+ValueOrder = Callable[[CSP, V, Dict[V, List[D]], Dict[V, D]], Iterable[D]]
+
+
+def natural_order(csp: CSP[V, D], variable: V, domains: Dict[V, List[D]], assignment: Dict[V, D]) -> Iterable[D]:
+    return domains[variable]
+
+
+# Least constraining value: values that rule out the fewest values of the unassigned neighbors first
+def least_constraining_value(csp: CSP[V, D], variable: V, domains: Dict[V, List[D]], assignment: Dict[V, D]) -> Iterable[D]:
+    values = domains[variable]
+    if len(values) < 2:
+        return values
+
+    def ruled_out(value: D) -> int:
+        domains[variable] = [value]
+        assignment[variable] = value
+        count = 0
+        for constraint in csp.constraints[variable]:
+            for other in constraint.variables:
+                if other not in assignment:
+                    count += len(domains[other]) - len(constraint.revise(other, domains, assignment))
+        del assignment[variable]
+        domains[variable] = values
+        return count
+
+    return sorted(values, key=ruled_out)
+
+
+# Tries the value hint gives each variable first, for instance the best assignment of min_conflicts
+def hinted_order(hint: Dict[V, D]) -> ValueOrder:
+    def order(csp: CSP[V, D], variable: V, domains: Dict[V, List[D]], assignment: Dict[V, D]) -> Iterable[D]:
+        values = domains[variable]
+        if variable not in hint or hint[variable] not in values:
+            return values
+        preferred = hint[variable]
+        return [preferred] + [value for value in values if value != preferred]
+    return order
+
+
+STOP_CHECK_INTERVAL: int = 256
+GREEDY_START_SAMPLE: int = 64
+
+
+# The configurations parallel_search races in portfolio mode, built fresh since orderings keep state
+def default_portfolio() -> List[Dict]:
+    return [
+        {},
+        {"inference": Inference.FORWARD_CHECKING, "variable_order": MinimumRemainingValues()},
+        {"inference": Inference.FORWARD_CHECKING, "variable_order": MinimumRemainingValues(degree=True), "value_order": least_constraining_value},
+        {"inference": Inference.MAC, "variable_order": DomWDeg()},
+    ]
+
+
+# Worker side of parallel_search: the CSP and the stop event are sent once per process
+_worker_csp: Optional[CSP] = None
+_worker_stop = None
+
+
+def _start_worker(csp: CSP, stop) -> None:
+    global _worker_csp, _worker_stop
+    _worker_csp = csp
+    _worker_stop = stop
+
+
+def _solve_task(assignment: Optional[Dict], options: Dict) -> Optional[Dict]:
+    if _worker_stop.is_set():
+        return None
+    for solution in _worker_csp._solutions(assignment, stop=_worker_stop.is_set, **options):
+        return dict(solution)
+    return None
+
+
@@ -0,0 +1,136 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from generic_search import PriorityQueue
+from maze import Maze, MazeLocation
+
+INFINITY = float("inf")
+Key = Tuple[float, float]
+
+
+# D* Lite incremental planner for a Maze whose cells change at runtime.
+# It searches backwards from the goal and keeps g/rhs values between calls, so after a batch of
+# cells changes only the vertices whose distance is affected are processed again.
+# The start can also move along the path (the classic robot-navigation use).
+class DStarLite:
+
+    def __init__(self, maze: Maze, start: Optional[MazeLocation] = None, goal: Optional[MazeLocation] = None) -> None:
+        self._maze = maze
+        self.start: MazeLocation = maze.start if start is None else start
+        self.goal: MazeLocation = maze.goal if goal is None else goal
+        self._last: MazeLocation = self.start
+        self._km: float = 0.0
+        self._g: Dict[MazeLocation, float] = {}
+        self._rhs: Dict[MazeLocation, float] = {self.goal: 0.0}
+        # stale heap entries are skipped: only the key recorded in _queued is live
+        self._queue: PriorityQueue[Tuple[Key, MazeLocation]] = PriorityQueue()
+        self._queued: Dict[MazeLocation, Key] = {}
+        self._insert(self.goal)
+
+    @staticmethod
+    def _h(a: MazeLocation, b: MazeLocation) -> float:
+        return abs(a.row - b.row) + abs(a.column - b.column)
+
+    def _key(self, ml: MazeLocation) -> Key:
+        best = min(self._g.get(ml, INFINITY), self._rhs.get(ml, INFINITY))
+        return (best + self._h(self.start, ml) + self._km, best)
+
+    def _insert(self, ml: MazeLocation) -> None:
+        key = self._key(ml)
+        self._queued[ml] = key
+        self._queue.push((key, ml))
+
+    def _top_key(self) -> Key:
+        while not self._queue.empty:
+            key, ml = self._queue.peek()
+            if self._queued.get(ml) == key:
+                return key
+            self._queue.pop()
+        return (INFINITY, INFINITY)
+
+    def _neighbors(self, ml: MazeLocation) -> List[MazeLocation]:
+        row, column = ml
+        return [MazeLocation(r, c) for r, c in ((row + 1, column), (row - 1, column), (row, column + 1), (row, column - 1))
+                if 0 <= r < self._maze.rows and 0 <= c < self._maze.columns]
+
+    def _cost(self, a: MazeLocation, b: MazeLocation) -> float:
+        if self._maze.is_blocked(a) or self._maze.is_blocked(b):
+            return INFINITY
+        return 1.0
+
+    def _update_vertex(self, ml: MazeLocation) -> None:
+        if ml != self.goal:
+            self._rhs[ml] = min((self._cost(ml, n) + self._g.get(n, INFINITY) for n in self._neighbors(ml)), default=INFINITY)
+        self._queued.pop(ml, None)
+        if self._g.get(ml, INFINITY) != self._rhs.get(ml, INFINITY):
+            self._insert(ml)
+
+    def _compute_shortest_path(self) -> None:
+        while (self._top_key() < self._key(self.start)
+               or self._rhs.get(self.start, INFINITY) != self._g.get(self.start, INFINITY)):
+            if not self._queued:
+                break
+            old_key = self._top_key()
+            _, ml = self._queue.pop()
+            del self._queued[ml]
+            new_key = self._key(ml)
+            if old_key < new_key:
+                self._insert(ml)
+            elif self._g.get(ml, INFINITY) > self._rhs.get(ml, INFINITY):
+                self._g[ml] = self._rhs[ml]
+                for neighbor in self._neighbors(ml):
+                    self._update_vertex(neighbor)
+            else:
+                self._g[ml] = INFINITY
+                self._update_vertex(ml)
+                for neighbor in self._neighbors(ml):
+                    self._update_vertex(neighbor)
+
+    def plan(self) -> Optional[List[MazeLocation]]:
+        self._compute_shortest_path()
+        if self._g.get(self.start, INFINITY) == INFINITY:
+            return None
+
+        path: List[MazeLocation] = [self.start]
+        current = self.start
+        while current != self.goal:
+            current = min(self._neighbors(current), key=lambda n: self._cost(current, n) + self._g.get(n, INFINITY))
+            if self._g.get(current, INFINITY) == INFINITY:
+                return None
+            path.append(current)
+        return path
+
+    # Call after the cells in changed were blocked or cleared on the maze (Maze.set_blocked).
+    # Passing start moves the planner to a new start cell before replanning.
+    def update(self, changed: Iterable[MazeLocation], start: Optional[MazeLocation] = None) -> Optional[List[MazeLocation]]:
+        if start is not None:
+            self._km += self._h(self._last, start)
+            self._last = start
+            self.start = start
+        for ml in changed:
+            self._update_vertex(ml)
+            for neighbor in self._neighbors(ml):
+                self._update_vertex(neighbor)
+        return self.plan()
+
+
+if __name__ == "__main__":
+    maze: Maze = Maze()
+    planner = DStarLite(maze)
+    path: Optional[List[MazeLocation]] = planner.plan()
+    if path is None:
+        print("No solution found!")
+    else:
+        maze.mark(path)
+        print(maze)
+        maze.clear(path)
+
+        # block a cell in the middle of the current path and repair the plan
+        if len(path) > 2:
+            blocked: MazeLocation = path[len(path) // 2]
+            maze.set_blocked(blocked)
+            path = planner.update([blocked])
+            if path is None:
+                print("No solution found after the change!")
+            else:
+                maze.mark(path)
+                print(maze)
+                maze.clear(path)
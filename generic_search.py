@@ -1,14 +1,33 @@
 from __future__ import annotations
-from typing import List, Dict, Iterable, Tuple, Any, Container, TypeVar, Sequence, Optional, Deque, Set, Callable, Generic
+from typing import List, Dict, Iterable, Iterator, Tuple, Any, Container, TypeVar, Sequence, Optional, Deque, Set, Callable, Generic
 from typing import Protocol
-from heapq import heappush, heappop
+from collections import OrderedDict
+from heapq import heappush, heappop, nsmallest, merge
 import bisect
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+import time
+import multiprocessing
+import pickle
+import traceback
+from multiprocessing.connection import Connection, wait
 
 T = TypeVar("T")
+R = TypeVar("R")
 C = TypeVar("C", bound="Comparable")
 
 
 class Node(Generic[T]):
+    # no per-node __dict__, searches allocate one Node for every generated state
+    __slots__ = ("state", "parent", "cost", "heuristic")
 
     def __init__(self, state: T, parent: Optional[Node], cost: float = 0.0, heuristic: float = 0.0) -> None:
         self.state = state
@@ -34,6 +53,9 @@ class Stack(Generic[T]):
         @property
         def empty(self) -> bool:
             return not self._container
+
+        def __len__(self) -> int:
+            return len(self._container)
     
         def __repr__(self) -> str:
             return repr(self._container)
@@ -53,11 +75,83 @@ class Queue(Generic[T]):
     @property
     def empty(self) -> bool:
         return not self._container
+
+    def __len__(self) -> int:
+        return len(self._container)
     
     def __repr__(self) -> str:
         return repr(self._container)
     
 
+# Column store for search trees with millions of nodes. Instead of one Node object per node it keeps
+# the parent index, the cost and an interned state id in parallel arrays, and every distinct state once.
+# Node objects are only built for the path that is returned (to_node), so node_to_path still works.
+class NodeStore(Generic[T]):
+
+    def __init__(self) -> None:
+        self._ids: Dict[T, int] = {}
+        self._states: List[T] = []
+        self._parents: array = array("q")
+        self._costs: array = array("d")
+        self._state_ids: array = array("q")
+
+    def intern(self, state: T) -> int:
+        state_id = self._ids.get(state)
+        if state_id is None:
+            state_id = len(self._states)
+            self._ids[state] = state_id
+            self._states.append(state)
+        return state_id
+
+    # parent is the index of the parent node, -1 for the root
+    def add(self, state: T, parent: int = -1, cost: float = 0.0) -> int:
+        self._state_ids.append(self.intern(state))
+        self._parents.append(parent)
+        self._costs.append(cost)
+        return len(self._parents) - 1
+
+    def state(self, index: int) -> T:
+        return self._states[self._state_ids[index]]
+
+    def state_id(self, index: int) -> int:
+        return self._state_ids[index]
+
+    def parent(self, index: int) -> int:
+        return self._parents[index]
+
+    def cost(self, index: int) -> float:
+        return self._costs[index]
+
+    @property
+    def state_count(self) -> int:
+        return len(self._states)
+
+    # True once the state has been interned by any node
+    def __contains__(self, state: Any) -> bool:
+        return state in self._ids
+
+    def __len__(self) -> int:
+        return len(self._parents)
+
+    def to_path(self, index: int) -> List[T]:
+        path: List[T] = []
+        while index != -1:
+            path.append(self.state(index))
+            index = self._parents[index]
+        path.reverse()
+        return path
+
+    def to_node(self, index: int) -> Node[T]:
+        chain: List[int] = []
+        while index != -1:
+            chain.append(index)
+            index = self._parents[index]
+        node: Optional[Node[T]] = None
+        for index in reversed(chain):
+            node = Node(self.state(index), node, self._costs[index])
+        return node
+
+
 class Comparable(Protocol):
 
     def __eq__(self, other: Any) -> bool:
@@ -86,17 +180,123 @@ class PriorityQueue(Generic[T]):
     @property
     def empty(self) -> bool:
         return not self._container
+
+    def __len__(self) -> int:
+        return len(self._container)
     
     def push(self, item: T) -> None:
         heappush(self._container, item)
 
     def pop(self) -> T:
         return heappop(self._container)
+
+    def peek(self) -> T:
+        return self._container[0]
     
     def __repr__(self) -> str:
         return repr(self._container)
 
 
+# Optional observer for the search functions. It counts the work done by a search and the time
+# spent inside the user's callbacks; hooks added with add_hook are called with every expanded node.
+# Searches only touch it behind an `if stats is not None` check, so leaving it out costs nothing.
+class SearchStats:
+
+    def __init__(self) -> None:
+        self.expanded: int = 0
+        self.generated: int = 0
+        self.duplicates: int = 0
+        self.max_frontier: int = 0
+        self.max_visited: int = 0
+        self.successors_time: float = 0.0
+        self.goal_test_time: float = 0.0
+        self.heuristic_time: float = 0.0
+        self._hooks: List[Callable[[Node], None]] = []
+
+    def add_hook(self, hook: Callable[[Node], None]) -> None:
+        self._hooks.append(hook)
+
+    # wraps a callback so the time spent inside it is added to the given attribute
+    def timed(self, function: Callable[..., Any], attribute: str) -> Callable[..., Any]:
+        def wrapper(*args: Any) -> Any:
+            begin = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                setattr(self, attribute, getattr(self, attribute) + time.perf_counter() - begin)
+        return wrapper
+
+    def expand(self, node: Node, frontier_size: int, visited_size: int) -> None:
+        self.expanded += 1
+        if frontier_size > self.max_frontier:
+            self.max_frontier = frontier_size
+        if visited_size > self.max_visited:
+            self.max_visited = visited_size
+        for hook in self._hooks:
+            hook(node)
+
+    def __repr__(self) -> str:
+        return (f"SearchStats(expanded={self.expanded}, generated={self.generated}, duplicates={self.duplicates}, "
+                f"max_frontier={self.max_frontier}, max_visited={self.max_visited}, "
+                f"successors_time={self.successors_time:.6f}, goal_test_time={self.goal_test_time:.6f}, "
+                f"heuristic_time={self.heuristic_time:.6f})")
+
+
+# Memoizes a one-argument callback such as successors or heuristic, and can be passed to dfs,
+# bfs and astar in its place. The cache is a bounded LRU: each result weighs weigher(result)
+# (1 by default, len for successor lists) and the least recently used results are evicted
+# once the total weight goes over max_weight.
+class CachedCallback(Generic[T, R]):
+
+    def __init__(self, function: Callable[[T], R], max_weight: int = 100_000, weigher: Optional[Callable[[R], int]] = None) -> None:
+        if max_weight < 1:
+            raise ValueError("max_weight must be at least 1")
+        self._function = function
+        self._weigher = weigher
+        self._cache: OrderedDict[T, Tuple[R, int]] = OrderedDict()
+        self.max_weight: int = max_weight
+        self.weight: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __call__(self, state: T) -> R:
+        cached = self._cache.get(state)
+        if cached is not None:
+            self._cache.move_to_end(state)
+            self.hits += 1
+            return cached[0]
+
+        self.misses += 1
+        result = self._function(state)
+        weight = 1 if self._weigher is None else max(1, self._weigher(result))
+        # a result bigger than the whole cache would only flush everything else
+        if weight > self.max_weight:
+            return result
+        self._cache[state] = (result, weight)
+        self.weight += weight
+        while self.weight > self.max_weight:
+            _, (_, evicted_weight) = self._cache.popitem(last=False)
+            self.weight -= evicted_weight
+            self.evictions += 1
+        return result
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.weight = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __repr__(self) -> str:
+        return f"CachedCallback(entries={len(self)}, weight={self.weight}/{self.max_weight}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+
 def linear_search(iterable: Iterable[T], target: T) -> bool:
     for item in iterable:
         if item == target:
@@ -120,7 +320,77 @@ def binary_search(sequence: Sequence[C], key_target: C) -> bool:
     return False
 
 
-def dfs(start: T, successors: Callable[[T],List[T]], goal_test: Callable[[T], bool]) -> Optional[Node[T]]:
+def _numeric_array(values: Any) -> Optional[Any]:
+    if np is None:
+        return None
+    try:
+        values = np.asarray(values)
+    except ValueError:
+        # ragged input such as a mix of scalars and tuples
+        return None
+    return values if values.ndim == 1 and values.dtype.kind in "biuf" else None
+
+
+# Looks up many keys in one sorted sequence. Numeric data goes through numpy.searchsorted in a
+# single vectorized call when numpy is installed, anything else falls back to bisect per key.
+def binary_search_many(sequence: Sequence[C], keys: Iterable[C]) -> List[bool]:
+    keys = list(keys)
+    numeric_sequence = _numeric_array(sequence)
+    numeric_keys = _numeric_array(keys) if numeric_sequence is not None else None
+    if numeric_sequence is not None and numeric_keys is not None:
+        positions = np.searchsorted(numeric_sequence, numeric_keys)
+        found = positions < len(numeric_sequence)
+        found[found] = numeric_sequence[positions[found]] == numeric_keys[found]
+        return found.tolist()
+
+    results: List[bool] = []
+    for key in keys:
+        position = bisect.bisect_left(sequence, key)
+        results.append(position < len(sequence) and sequence[position] == key)
+    return results
+
+
+# Built once from an iterable and reused for many membership queries.
+# Numeric items are kept as a sorted numpy array (vectorized contains_many), other hashable
+# items in a frozenset, and unhashable but comparable items in a sorted list searched with bisect.
+class MembershipIndex(Generic[T]):
+
+    def __init__(self, iterable: Iterable[T]) -> None:
+        items = list(iterable)
+        self._set: Optional[frozenset] = None
+        self._sorted: Optional[Sequence[T]] = None
+        numeric = _numeric_array(items) if items else None
+        self._numeric = numeric is not None
+        if numeric is not None:
+            self._sorted = np.unique(numeric)
+            return
+        try:
+            self._set = frozenset(items)
+        except TypeError:
+            self._sorted = sorted(items)
+
+    def __contains__(self, item: Any) -> bool:
+        if self._set is not None:
+            return item in self._set
+        return self.contains_many([item])[0]
+
+    def __len__(self) -> int:
+        return len(self._set) if self._set is not None else len(self._sorted)
+
+    def contains_many(self, keys: Iterable[T]) -> List[bool]:
+        if self._set is not None:
+            return [key in self._set for key in keys]
+        keys = list(keys)
+        if self._numeric and _numeric_array(keys) is None:
+            # only numeric keys can be in a numeric index, the others can't even be compared with it
+            return [_numeric_array([key]) is not None and binary_search_many(self._sorted, [key])[0] for key in keys]
+        return binary_search_many(self._sorted, keys)
+
+
+def dfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], bool], stats: Optional[SearchStats] = None) -> Optional[Node[T]]:
+    if stats is not None:
+        successors = stats.timed(successors, "successors_time")
+        goal_test = stats.timed(goal_test, "goal_test_time")
 
     frontier: Stack[Node[T]] = Stack()
     frontier.push(Node(start, None))
@@ -129,10 +399,17 @@ def dfs(start: T, successors: Callable[[T],List[T]], goal_test: Callable[[T], bo
 
     while not frontier.empty:
         current_node = frontier.pop()
+        if stats is not None:
+            stats.expand(current_node, len(frontier) + 1, len(visited))
         if goal_test(current_node.state):
             return current_node
-        for child in successors(current_node.state):
+        children = successors(current_node.state)
+        if stats is not None:
+            stats.generated += len(children)
+        for child in children:
             if child in visited:
+                if stats is not None:
+                    stats.duplicates += 1
                 continue
             frontier.push(Node(child, current_node))
             visited.add(child)
@@ -140,7 +417,11 @@ def dfs(start: T, successors: Callable[[T],List[T]], goal_test: Callable[[T], bo
     return None
 
 
-def bfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], bool]) -> Optional[Node[T]]:
+def bfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], bool], stats: Optional[SearchStats] = None) -> Optional[Node[T]]:
+    if stats is not None:
+        successors = stats.timed(successors, "successors_time")
+        goal_test = stats.timed(goal_test, "goal_test_time")
+
     frontier: Queue[Node[T]] = Queue()
     frontier.push(Node(start, None))
 
@@ -148,10 +429,17 @@ def bfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], b
 
     while not frontier.empty:
         current_node = frontier.pop()
+        if stats is not None:
+            stats.expand(current_node, len(frontier) + 1, len(visited))
         if goal_test(current_node.state):
             return current_node
-        for child in successors(current_node.state):
+        children = successors(current_node.state)
+        if stats is not None:
+            stats.generated += len(children)
+        for child in children:
             if child in visited:
+                if stats is not None:
+                    stats.duplicates += 1
                 continue
             frontier.push(Node(child, current_node))
             visited.add(child)
@@ -159,24 +447,625 @@ def bfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], b
     return None
 
 
-def astar(start:T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]], heuristic: Callable[[T], float]) -> Optional[Node[T]]: 
+# bfs on top of a NodeStore. Nodes are appended in the order they are generated,
+# so the frontier is just the range of node indices that haven't been expanded yet.
+# A store passed in must be empty: states already in it would count as visited.
+def compact_bfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], bool], store: Optional[NodeStore[T]] = None) -> Optional[Node[T]]:
+    store = NodeStore() if store is None else store
+    if len(store) != 0:
+        raise ValueError("compact_bfs needs an empty NodeStore")
+    head = store.add(start)
+
+    while head < len(store):
+        state = store.state(head)
+        if goal_test(state):
+            return store.to_node(head)
+        for child in successors(state):
+            if child in store:
+                continue
+            store.add(child, head)
+        head += 1
+
+    return None
+
+
+# astar on top of a NodeStore. The heap only holds (f, node index) pairs and the best known cost
+# of every state lives in an array indexed by its interned id. A store passed in must be empty.
+def compact_astar(start: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]], heuristic: Callable[[T], float], store: Optional[NodeStore[T]] = None) -> Optional[Node[T]]:
+    store = NodeStore() if store is None else store
+    if len(store) != 0:
+        raise ValueError("compact_astar needs an empty NodeStore")
+    best_cost: array = array("d")
+    frontier: List[Tuple[float, int]] = []
+
+    index = store.add(start)
+    best_cost.extend([float("inf")] * store.state_count)
+    best_cost[store.state_id(index)] = 0.0
+    heappush(frontier, (heuristic(start), index))
+
+    while frontier:
+        _, index = heappop(frontier)
+        cost = store.cost(index)
+        if cost > best_cost[store.state_id(index)]:
+            continue
+        state = store.state(index)
+        if goal_test(state):
+            return store.to_node(index)
+        new_cost = cost + 1
+        for child in successors(state):
+            child_id = store.intern(child)
+            if child_id >= len(best_cost):
+                best_cost.extend([float("inf")] * (store.state_count - len(best_cost)))
+            if best_cost[child_id] <= new_cost:
+                continue
+            best_cost[child_id] = new_cost
+            heappush(frontier, (new_cost + heuristic(child), store.add(child, index, new_cost)))
+
+    return None
+
+
+# Grows one frontier from start (through successors) and one from goal (through predecessors),
+# always expanding a whole layer of the smaller side, until they meet.
+# The two halves are stitched into a single Node chain from start to goal.
+def bidirectional_bfs(start: T, goal: T, successors: Callable[[T], List[T]], predecessors: Callable[[T], List[T]]) -> Optional[Node[T]]:
+    forward: Dict[T, Node[T]] = {start: Node(start, None)}
+    backward: Dict[T, Node[T]] = {goal: Node(goal, None)}
+    if start == goal:
+        return forward[start]
+
+    forward_layer: List[T] = [start]
+    backward_layer: List[T] = [goal]
+
+    while forward_layer and backward_layer:
+        expand_forward = len(forward_layer) <= len(backward_layer)
+        if expand_forward:
+            layer, visited, other, neighbors = forward_layer, forward, backward, successors
+        else:
+            layer, visited, other, neighbors = backward_layer, backward, forward, predecessors
+
+        # finish the whole layer so the shortest of the meeting points is kept
+        meeting: Optional[T] = None
+        best_length = 0
+        next_layer: List[T] = []
+        for state in layer:
+            current_node = visited[state]
+            for child in neighbors(state):
+                if child in visited:
+                    continue
+                visited[child] = Node(child, current_node, current_node.cost + 1)
+                next_layer.append(child)
+                if child in other:
+                    length = visited[child].cost + other[child].cost
+                    if meeting is None or length < best_length:
+                        meeting, best_length = child, length
+
+        if meeting is not None:
+            node = forward[meeting]
+            back_node = backward[meeting].parent
+            while back_node is not None:
+                node = Node(back_node.state, node, node.cost + 1)
+                back_node = back_node.parent
+            return node
+
+        if expand_forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def astar(start:T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]], heuristic: Callable[[T], float], stats: Optional[SearchStats] = None) -> Optional[Node[T]]: 
+    if stats is not None:
+        successors = stats.timed(successors, "successors_time")
+        goal_test = stats.timed(goal_test, "goal_test_time")
+        heuristic = stats.timed(heuristic, "heuristic_time")
+
     frontier: PriorityQueue[Node[T]] = PriorityQueue()
     frontier.push(Node(start, None, 0.0, heuristic(start)))
-    explored: Dict[T: float] = {start: 0.0}
+    explored: Dict[T, float] = {start: 0.0}
 
     while not frontier.empty:
         current_node = frontier.pop()
+        # a cheaper route to this state was pushed after this entry, so it is stale
+        if current_node.cost > explored[current_node.state]:
+            if stats is not None:
+                stats.duplicates += 1
+            continue
+        if stats is not None:
+            stats.expand(current_node, len(frontier) + 1, len(explored))
         if goal_test(current_node.state):
             return current_node
-        for child in successors(current_node.state):
+        children = successors(current_node.state)
+        if stats is not None:
+            stats.generated += len(children)
+        for child in children:
             new_cost = current_node.cost + 1
             if child not in explored or explored[child] > new_cost:
                 explored[child] = new_cost
                 frontier.push(Node(child, current_node, new_cost, heuristic(child)))
+            elif stats is not None:
+                stats.duplicates += 1
 
     return None            
 
 
+# Same as astar, but successors returns (state, step cost) pairs instead of assuming every step costs 1.
+# The heap has no decrease-key, so a cheaper route just pushes a new entry and the old one
+# is skipped when popped (lazy deletion). Each state is expanded at most once for a consistent heuristic.
+def weighted_astar(start: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[Tuple[T, float]]], heuristic: Callable[[T], float], stats: Optional[SearchStats] = None) -> Optional[Node[T]]:
+    if stats is not None:
+        successors = stats.timed(successors, "successors_time")
+        goal_test = stats.timed(goal_test, "goal_test_time")
+        heuristic = stats.timed(heuristic, "heuristic_time")
+
+    frontier: PriorityQueue[Node[T]] = PriorityQueue()
+    frontier.push(Node(start, None, 0.0, heuristic(start)))
+    explored: Dict[T, float] = {start: 0.0}
+
+    while not frontier.empty:
+        current_node = frontier.pop()
+        if current_node.cost > explored[current_node.state]:
+            if stats is not None:
+                stats.duplicates += 1
+            continue
+        if stats is not None:
+            stats.expand(current_node, len(frontier) + 1, len(explored))
+        if goal_test(current_node.state):
+            return current_node
+        children = successors(current_node.state)
+        if stats is not None:
+            stats.generated += len(children)
+        for child, step_cost in children:
+            new_cost = current_node.cost + step_cost
+            if child not in explored or explored[child] > new_cost:
+                explored[child] = new_cost
+                frontier.push(Node(child, current_node, new_cost, heuristic(child)))
+            elif stats is not None:
+                stats.duplicates += 1
+
+    return None
+
+
+# Iterative-deepening A*: repeated depth-first passes bounded by f = cost + heuristic.
+# Only the current path is kept in memory, at the price of re-visiting nodes on every pass.
+# Without a visited set it enumerates simple paths, so proving there is no solution can take very long.
+def idastar(start: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]], heuristic: Callable[[T], float]) -> Optional[Node[T]]:
+    root: Node[T] = Node(start, None, 0.0, heuristic(start))
+    if goal_test(start):
+        return root
+    bound = root.cost + root.heuristic
+
+    while True:
+        next_bound = float("inf")
+        on_path: Set[T] = {start}
+        # explicit stack instead of recursion, so deep searches don't hit the recursion limit
+        stack: List[Tuple[Node[T], Iterator[T]]] = [(root, iter(successors(start)))]
+        while stack:
+            current_node, children = stack[-1]
+            try:
+                child = next(children)
+            except StopIteration:
+                stack.pop()
+                on_path.discard(current_node.state)
+                continue
+            if child in on_path:
+                continue
+            child_node = Node(child, current_node, current_node.cost + 1, heuristic(child))
+            f = child_node.cost + child_node.heuristic
+            if f > bound:
+                next_bound = min(next_bound, f)
+                continue
+            if goal_test(child):
+                return child_node
+            on_path.add(child)
+            stack.append((child_node, iter(successors(child))))
+
+        if next_bound == float("inf"):
+            return None
+        bound = next_bound
+
+
+# Breadth-first search that only keeps the beam_width best nodes (by cost + heuristic) of each layer.
+# Memory grows with beam_width * depth instead of with the whole state space, but the search is
+# not complete: a solution can be pruned away with the rest of a layer.
+def beam_search(start: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]], heuristic: Callable[[T], float], beam_width: int = 100) -> Optional[Node[T]]:
+    if beam_width < 1:
+        raise ValueError("beam_width must be at least 1")
+
+    beam: List[Node[T]] = [Node(start, None, 0.0, heuristic(start))]
+    if goal_test(start):
+        return beam[0]
+    # only states that made it into a beam are remembered, so this is bounded like the beam itself
+    visited: Set[T] = {start}
+
+    while beam:
+        candidates: Dict[T, Node[T]] = {}
+        for current_node in beam:
+            for child in successors(current_node.state):
+                if child in visited or child in candidates:
+                    continue
+                child_node = Node(child, current_node, current_node.cost + 1, heuristic(child))
+                if goal_test(child):
+                    return child_node
+                candidates[child] = child_node
+        beam = nsmallest(beam_width, candidates.values())
+        visited.update(node.state for node in beam)
+
+    return None
+
+
+# Generator versions of dfs, bfs and astar. They yield every goal node as it is found and
+# keep searching past it, so the caller can stop after k results or keep pulling lazily;
+# the search state lives in the suspended generator between yields.
+def iter_dfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], bool]) -> Iterator[Node[T]]:
+    frontier: Stack[Node[T]] = Stack()
+    frontier.push(Node(start, None))
+    visited: Set[T] = {start}
+
+    while not frontier.empty:
+        current_node = frontier.pop()
+        if goal_test(current_node.state):
+            yield current_node
+        for child in successors(current_node.state):
+            if child in visited:
+                continue
+            frontier.push(Node(child, current_node))
+            visited.add(child)
+
+
+def iter_bfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], bool]) -> Iterator[Node[T]]:
+    frontier: Queue[Node[T]] = Queue()
+    frontier.push(Node(start, None))
+    visited: Set[T] = {start}
+
+    while not frontier.empty:
+        current_node = frontier.pop()
+        if goal_test(current_node.state):
+            yield current_node
+        for child in successors(current_node.state):
+            if child in visited:
+                continue
+            frontier.push(Node(child, current_node))
+            visited.add(child)
+
+
+# Goals come out in cost order as long as the heuristic is consistent and 0 on goal states.
+# With paths_per_state > 1 every state may be expanded that many times, which yields up to
+# paths_per_state cheapest paths to each goal (these are walks: a path may revisit a state).
+def iter_astar(start: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]], heuristic: Callable[[T], float], paths_per_state: int = 1) -> Iterator[Node[T]]:
+    if paths_per_state < 1:
+        raise ValueError("paths_per_state must be at least 1")
+
+    frontier: PriorityQueue[Node[T]] = PriorityQueue()
+    frontier.push(Node(start, None, 0.0, heuristic(start)))
+    explored: Dict[T, float] = {start: 0.0}
+    expansions: Dict[T, int] = {}
+
+    while not frontier.empty:
+        current_node = frontier.pop()
+        state = current_node.state
+        count = expansions.get(state, 0)
+        if count >= paths_per_state:
+            continue
+        if paths_per_state == 1 and current_node.cost > explored[state]:
+            continue
+        expansions[state] = count + 1
+        if goal_test(state):
+            yield current_node
+        for child in successors(state):
+            new_cost = current_node.cost + 1
+            if paths_per_state == 1:
+                if child in explored and explored[child] <= new_cost:
+                    continue
+                explored[child] = new_cost
+            elif expansions.get(child, 0) >= paths_per_state:
+                continue
+            frontier.push(Node(child, current_node, new_cost, heuristic(child)))
+
+
+# Worker side of parallel_bfs. Each worker owns the visited states (with their parents) of its hash
+# slice and the part of the frontier that falls in it. For every level it expands its frontier,
+# keeps the children it owns that it hasn't seen, and sends every other worker one batch (maybe
+# empty) of the children owned by that worker, without duplicates. Then it takes the batch of each
+# other worker from its own inbox. The driver only sees (goal found, size of the next frontier).
+# Every reply is ("ok", value) or ("error", (exception, traceback)): a worker whose successors or
+# goal_test raises still sends its (empty) batches, so the others finish the level, and reports it.
+def _partition_worker(index: int, connection: Connection, inboxes: List[Any], successors: Callable[[T], List[T]], goal_test: Callable[[T], bool]) -> None:
+    workers = len(inboxes)
+    parents: Dict[T, Optional[T]] = {}
+    frontier: List[T] = []
+    while True:
+        command, payload = connection.recv()
+        if command == "start":
+            if hash(payload) % workers == index:
+                parents[payload] = None
+                frontier.append(payload)
+        elif command == "expand":
+            goal: Optional[T] = None
+            error: Optional[BaseException] = None
+            next_frontier: List[T] = []
+            outgoing: List[Dict[T, T]] = [{} for _ in range(workers)]
+            try:
+                for state in frontier:
+                    if goal_test(state):
+                        goal = state
+                        break
+                    for child in successors(state):
+                        owner = hash(child) % workers
+                        if owner == index:
+                            if child not in parents:
+                                parents[child] = state
+                                next_frontier.append(child)
+                        elif child not in outgoing[owner]:
+                            outgoing[owner][child] = state
+            except Exception as exception:
+                error = exception
+            if goal is not None or error is not None:
+                # the search is over, but every other worker still waits for a batch from this one
+                outgoing = [{} for _ in range(workers)]
+
+            for other in range(workers):
+                if other != index:
+                    inboxes[other].put(list(outgoing[other].items()))
+            for _ in range(workers - 1):
+                for child, parent in inboxes[index].get():
+                    if child not in parents:
+                        parents[child] = parent
+                        next_frontier.append(child)
+            frontier = next_frontier
+            if error is not None:
+                _send_error(connection, error)
+            else:
+                connection.send(("ok", (goal, len(frontier))))
+        elif command == "parent":
+            connection.send(("ok", (payload in parents, parents.get(payload))))
+        else:
+            connection.close()
+            return
+
+
+# Sends the exception itself when it survives pickling, so the driver can raise the same type,
+# and a RuntimeError otherwise; the worker's traceback goes along as text either way.
+def _send_error(connection: Connection, error: BaseException) -> None:
+    text = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        error = RuntimeError(f"{type(error).__name__}: {error}")
+    connection.send(("error", (error, text)))
+
+
+# One reply from every worker, in worker order. Waits on the processes as well as the pipes, so a
+# worker that dies without replying raises RuntimeError instead of blocking the driver, and an
+# error reported by a worker is raised here.
+def _gather(connections: List[Connection], processes: List[multiprocessing.Process]) -> List[Any]:
+    replies: List[Any] = [None] * len(connections)
+    pending: Dict[Any, int] = {connection: index for index, connection in enumerate(connections)}
+    sentinels: Dict[Any, int] = {process.sentinel: index for index, process in enumerate(processes)}
+    while pending:
+        ready = wait(list(pending) + list(sentinels))
+        for waitable in ready:
+            if waitable in pending:
+                index = pending.pop(waitable)
+                try:
+                    replies[index] = waitable.recv()
+                except EOFError:
+                    _worker_died(processes, index)
+        for waitable in ready:
+            index = sentinels.get(waitable)
+            if index is not None and connections[index] in pending and not connections[index].poll():
+                _worker_died(processes, index)
+    for index, (status, value) in enumerate(replies):
+        if status == "error":
+            error, text = value
+            raise error from RuntimeError(f"in parallel_bfs worker {index}:\n{text}")
+    return [value for _, value in replies]
+
+
+def _worker_died(processes: List[multiprocessing.Process], index: int) -> None:
+    processes[index].join()
+    raise RuntimeError(f"parallel_bfs worker {index} exited with code {processes[index].exitcode}")
+
+
+# Level-synchronous breadth-first search spread across worker processes.
+# States are partitioned by hash, so every worker keeps only its slice of the visited set, and the
+# workers pass generated states straight to their owners through one inbox queue each.
+# The driver only runs the level barrier, stops the search and follows the parents of the goal.
+# successors and goal_test must be picklable when the platform doesn't fork. An exception they
+# raise in a worker is raised here, and the workers are terminated.
+def parallel_bfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], bool], workers: Optional[int] = None) -> Optional[Node[T]]:
+    workers = workers or multiprocessing.cpu_count()
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    connections: List[Connection] = []
+    processes: List[multiprocessing.Process] = []
+    # the workers route states by hash among themselves, so they need the same hash seed:
+    # forked workers inherit this process's, spawned ones are given a fixed one
+    seed = os.environ.get("PYTHONHASHSEED")
+    if multiprocessing.get_start_method() != "fork" and seed is None:
+        os.environ["PYTHONHASHSEED"] = "0"
+    try:
+        for index in range(workers):
+            driver_end, worker_end = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_partition_worker, args=(index, worker_end, inboxes, successors, goal_test), daemon=True)
+            process.start()
+            worker_end.close()
+            connections.append(driver_end)
+            processes.append(process)
+    finally:
+        if seed is None:
+            os.environ.pop("PYTHONHASHSEED", None)
+
+    finished = False
+    try:
+        for connection in connections:
+            connection.send(("start", start))
+        while True:
+            for connection in connections:
+                connection.send(("expand", None))
+            reports: List[Tuple[Optional[T], int]] = _gather(connections, processes)
+
+            goal: Optional[T] = next((found for found, _ in reports if found is not None), None)
+            if goal is not None:
+                # ask every worker for the parent, only the owner of the state knows it
+                states: List[T] = [goal]
+                while True:
+                    for connection in connections:
+                        connection.send(("parent", states[-1]))
+                    answers = _gather(connections, processes)
+                    parent = next(parent for known, parent in answers if known)
+                    if parent is None:
+                        break
+                    states.append(parent)
+                node: Optional[Node[T]] = None
+                for state in reversed(states):
+                    node = Node(state, node)
+                finished = True
+                return node
+
+            if all(size == 0 for _, size in reports):
+                finished = True
+                return None
+    finally:
+        # after a failure some workers may be waiting for batches that will never come
+        for process in processes:
+            if not finished:
+                process.terminate()
+        for connection in connections:
+            if finished:
+                connection.send(("stop", None))
+            connection.close()
+        for process in processes:
+            process.join()
+
+
+# Turns a state into fixed-width bytes and back, for searches that keep their states on disk.
+class StateCodec(Protocol[T]):
+    width: int
+
+    def encode(self, state: T) -> bytes:
+        ...
+
+    def decode(self, data: bytes) -> T:
+        ...
+
+
+# StateCodec for tuple-like states (NamedTuples such as MazeLocation), packed with a struct format.
+class StructCodec(Generic[T]):
+
+    def __init__(self, fmt: str, factory: Callable[..., T]) -> None:
+        self._struct = struct.Struct(fmt)
+        self._factory = factory
+        self.width: int = self._struct.size
+
+    def encode(self, state: T) -> bytes:
+        return self._struct.pack(*state)
+
+    def decode(self, data: bytes) -> T:
+        return self._factory(*self._struct.unpack(data))
+
+
+def _read_records(path: str, record_width: int) -> Iterator[bytes]:
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for offset in range(0, len(mapped), record_width):
+            yield mapped[offset:offset + record_width]
+
+
+def _write_run(path: str, records: List[bytes]) -> None:
+    records.sort()
+    with open(path, "wb") as file:
+        file.write(b"".join(records))
+
+
+# binary search of a sorted layer file for the parent recorded next to key
+def _find_parent(path: str, key: bytes) -> bytes:
+    width = len(key)
+    record_width = 2 * width
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        low = 0
+        high = len(mapped) // record_width - 1
+        while low <= high:
+            mid = (low + high) // 2
+            offset = mid * record_width
+            found = mapped[offset:offset + width]
+            if found < key:
+                low = mid + 1
+            elif found > key:
+                high = mid - 1
+            else:
+                return mapped[offset + width:offset + record_width]
+    raise LookupError("State missing from its layer file")
+
+
+# Breadth-first search whose visited set lives on disk instead of in a hash set.
+# Every layer is a file of sorted (state, parent) records of fixed width, read back through mmap.
+# Children are buffered in memory up to chunk_size records, written out as sorted runs, and the runs
+# are merged into the next layer while duplicates (within the layer and against the earlier layers)
+# are dropped by walking the sorted streams side by side.
+# For undirected state graphs duplicate_layers=2 is enough: a child can only repeat the last two layers.
+def external_bfs(start: T, successors: Callable[[T], List[T]], goal_test: Callable[[T], bool], codec: StateCodec[T], directory: Optional[str] = None, chunk_size: int = 1_000_000, duplicate_layers: Optional[int] = None) -> Optional[Node[T]]:
+    width = codec.width
+    record_width = 2 * width
+
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        start_key = codec.encode(start)
+        layers: List[str] = [os.path.join(workdir, "layer0")]
+        # the root is its own parent
+        _write_run(layers[0], [start_key + start_key])
+
+        while True:
+            runs: List[str] = []
+            buffer: List[bytes] = []
+            for record in _read_records(layers[-1], record_width):
+                key = record[:width]
+                state = codec.decode(key)
+                if goal_test(state):
+                    keys: List[bytes] = [key]
+                    for layer in reversed(layers[1:]):
+                        keys.append(_find_parent(layer, keys[-1]))
+                    node: Optional[Node[T]] = None
+                    for depth, key in enumerate(reversed(keys)):
+                        node = Node(codec.decode(key), node, float(depth))
+                    return node
+                for child in successors(state):
+                    buffer.append(codec.encode(child) + key)
+                if len(buffer) >= chunk_size:
+                    runs.append(os.path.join(workdir, f"run{len(layers)}_{len(runs)}"))
+                    _write_run(runs[-1], buffer)
+                    buffer = []
+            if buffer:
+                runs.append(os.path.join(workdir, f"run{len(layers)}_{len(runs)}"))
+                _write_run(runs[-1], buffer)
+            if not runs:
+                return None
+
+            checked = layers if duplicate_layers is None else layers[-duplicate_layers:]
+            earlier: Iterator[bytes] = merge(*(_read_records(layer, record_width) for layer in checked))
+            earlier_key: Optional[bytes] = next(earlier, None)
+            next_layer = os.path.join(workdir, f"layer{len(layers)}")
+            written = 0
+            last_key: Optional[bytes] = None
+            with open(next_layer, "wb") as file:
+                for record in merge(*(_read_records(run, record_width) for run in runs)):
+                    key = record[:width]
+                    if key == last_key:
+                        continue
+                    last_key = key
+                    while earlier_key is not None and earlier_key[:width] < key:
+                        earlier_key = next(earlier, None)
+                    if earlier_key is not None and earlier_key[:width] == key:
+                        continue
+                    file.write(record)
+                    written += 1
+            for run in runs:
+                os.remove(run)
+            if written == 0:
+                return None
+            layers.append(next_layer)
+
+
 def node_to_path(final_node: Node[T]) -> List[T]:
     path: List[T] = []
     temp_node = final_node
@@ -194,4 +1083,6 @@ def node_to_path(final_node: Node[T]) -> List[T]:
 if __name__ == "__main__":
     print(linear_search([1, 2, 3, 4, 5], 3))
     print(binary_search([1, 2, 3, 4, 5], 3))
-    print(binary_search(['a', 'b', 'c', 'd', 'e'], 't'))
\ No newline at end of file
+    print(binary_search(['a', 'b', 'c', 'd', 'e'], 't'))
+    print(binary_search_many([1, 2, 3, 4, 5], [0, 3, 5, 6]))
+    print(MembershipIndex(['a', 'b', 'c']).contains_many(['b', 't']))
\ No newline at end of file
@@ -0,0 +1,206 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from collections import deque
+from generic_search import weighted_astar, node_to_path
+from maze import Maze, MazeLocation
+
+Cluster = Tuple[int, int]
+Border = Tuple[Cluster, Cluster]
+
+# open runs along a border longer than this get an entrance at each end instead of one in the middle
+LONG_ENTRANCE: int = 6
+
+
+# Hierarchical pathfinding (HPA*) over a Maze.
+# The grid is split into square clusters. Entrances are the cells on both sides of the open runs
+# along the border between two clusters, and become the nodes of an abstract graph: nodes of the
+# same cluster are linked by their distance inside it, and each entrance pair by a single step.
+# A query searches the small abstract graph first and then refines every abstract edge with a
+# local search restricted to one cluster. Paths are near-optimal, not always optimal.
+class HierarchicalMaze:
+
+    def __init__(self, maze: Maze, cluster_size: int = 16) -> None:
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2")
+        self._maze = maze
+        self._size = cluster_size
+        self._cluster_rows = (maze.rows + cluster_size - 1) // cluster_size
+        self._cluster_columns = (maze.columns + cluster_size - 1) // cluster_size
+        self._entrances: Dict[Border, List[Tuple[MazeLocation, MazeLocation]]] = {}
+        # inter-cluster edges: entrance cell -> the cells paired with it across a border
+        self._inter: Dict[MazeLocation, Set[MazeLocation]] = {}
+        # intra-cluster edges: cluster -> node -> (node -> distance inside the cluster)
+        self._intra: Dict[Cluster, Dict[MazeLocation, Dict[MazeLocation, float]]] = {}
+
+        for cluster in self._clusters():
+            for border in self._borders(cluster):
+                if border[0] == cluster:
+                    self._build_border(border)
+        for cluster in self._clusters():
+            self._build_cluster(cluster)
+
+    def _clusters(self) -> Iterable[Cluster]:
+        for cluster_row in range(self._cluster_rows):
+            for cluster_column in range(self._cluster_columns):
+                yield (cluster_row, cluster_column)
+
+    def cluster_of(self, ml: MazeLocation) -> Cluster:
+        return (ml.row // self._size, ml.column // self._size)
+
+    # borders are keyed (upper or left cluster, lower or right cluster)
+    def _borders(self, cluster: Cluster) -> List[Border]:
+        cluster_row, cluster_column = cluster
+        borders: List[Border] = []
+        if cluster_row > 0:
+            borders.append(((cluster_row - 1, cluster_column), cluster))
+        if cluster_column > 0:
+            borders.append(((cluster_row, cluster_column - 1), cluster))
+        if cluster_row + 1 < self._cluster_rows:
+            borders.append((cluster, (cluster_row + 1, cluster_column)))
+        if cluster_column + 1 < self._cluster_columns:
+            borders.append((cluster, (cluster_row, cluster_column + 1)))
+        return borders
+
+    def _in_cluster(self, ml: MazeLocation, cluster: Cluster) -> bool:
+        return ml.row // self._size == cluster[0] and ml.column // self._size == cluster[1]
+
+    def _build_border(self, border: Border) -> None:
+        for a, b in self._entrances.get(border, []):
+            self._inter[a].discard(b)
+            self._inter[b].discard(a)
+
+        first, second = border
+        pairs: List[Tuple[MazeLocation, MazeLocation]] = []
+        if first[0] == second[0]:
+            # vertical border: walk down the last column of first and the first column of second
+            column = second[1] * self._size
+            cells = [(MazeLocation(row, column - 1), MazeLocation(row, column))
+                     for row in range(first[0] * self._size, min((first[0] + 1) * self._size, self._maze.rows))]
+        else:
+            row = second[0] * self._size
+            cells = [(MazeLocation(row - 1, column), MazeLocation(row, column))
+                     for column in range(first[1] * self._size, min((first[1] + 1) * self._size, self._maze.columns))]
+
+        run: List[Tuple[MazeLocation, MazeLocation]] = []
+        # the trailing sentinel closes the last run
+        for a, b in cells + [(None, None)]:
+            if a is not None and not self._maze.is_blocked(a) and not self._maze.is_blocked(b):
+                run.append((a, b))
+                continue
+            if len(run) >= LONG_ENTRANCE:
+                pairs.extend((run[0], run[-1]))
+            elif run:
+                pairs.append(run[len(run) // 2])
+            run = []
+
+        self._entrances[border] = pairs
+        for a, b in pairs:
+            self._inter.setdefault(a, set()).add(b)
+            self._inter.setdefault(b, set()).add(a)
+
+    # breadth-first flood that never leaves the cluster
+    def _flood(self, source: MazeLocation, cluster: Cluster) -> Dict[MazeLocation, Optional[MazeLocation]]:
+        parents: Dict[MazeLocation, Optional[MazeLocation]] = {source: None}
+        frontier = deque([source])
+        while frontier:
+            current = frontier.popleft()
+            for child in self._maze.successors(current):
+                if child not in parents and self._in_cluster(child, cluster):
+                    parents[child] = current
+                    frontier.append(child)
+        return parents
+
+    def _distances(self, source: MazeLocation, targets: Iterable[MazeLocation], cluster: Cluster) -> Dict[MazeLocation, float]:
+        depths: Dict[MazeLocation, int] = {source: 0}
+        frontier = deque([source])
+        while frontier:
+            current = frontier.popleft()
+            for child in self._maze.successors(current):
+                if child not in depths and self._in_cluster(child, cluster):
+                    depths[child] = depths[current] + 1
+                    frontier.append(child)
+        return {target: float(depths[target]) for target in targets if target != source and target in depths}
+
+    def _build_cluster(self, cluster: Cluster) -> None:
+        nodes: Set[MazeLocation] = set()
+        for border in self._borders(cluster):
+            for a, b in self._entrances.get(border, []):
+                nodes.add(a if self._in_cluster(a, cluster) else b)
+        self._intra[cluster] = {node: self._distances(node, nodes, cluster) for node in nodes}
+
+    # Call after the cells in changed were blocked or cleared on the maze (Maze.set_blocked).
+    # Only the borders the cells lie on and the clusters next to those borders are rebuilt.
+    def update(self, changed: Iterable[MazeLocation]) -> None:
+        dirty: Set[Cluster] = set()
+        for ml in changed:
+            cluster = self.cluster_of(ml)
+            dirty.add(cluster)
+            for border in self._borders(cluster):
+                first, second = border
+                if first[0] == second[0]:
+                    on_border = ml.column in (second[1] * self._size - 1, second[1] * self._size)
+                else:
+                    on_border = ml.row in (second[0] * self._size - 1, second[0] * self._size)
+                if on_border:
+                    self._build_border(border)
+                    dirty.update(border)
+        for cluster in dirty:
+            self._build_cluster(cluster)
+
+    def _local_path(self, a: MazeLocation, b: MazeLocation, cluster: Cluster) -> Optional[List[MazeLocation]]:
+        parents = self._flood(a, cluster)
+        if b not in parents:
+            return None
+        path: List[MazeLocation] = [b]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return path
+
+    def find_path(self, start: Optional[MazeLocation] = None, goal: Optional[MazeLocation] = None) -> Optional[List[MazeLocation]]:
+        start = self._maze.start if start is None else start
+        goal = self._maze.goal if goal is None else goal
+        if start == goal:
+            return [start]
+
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        # temporary edges linking start and goal to the entrances of their clusters
+        start_links = self._distances(start, list(self._intra[start_cluster]) + [goal], start_cluster)
+        if goal_cluster != start_cluster:
+            start_links.pop(goal, None)
+        goal_links = self._distances(goal, self._intra[goal_cluster], goal_cluster)
+
+        def successors(node: MazeLocation) -> List[Tuple[MazeLocation, float]]:
+            if node == start:
+                edges = list(start_links.items())
+            else:
+                edges = list(self._intra[self.cluster_of(node)].get(node, {}).items())
+            edges.extend((other, 1.0) for other in self._inter.get(node, ()))
+            if node in goal_links:
+                edges.append((goal, goal_links[node]))
+            return edges
+
+        solution = weighted_astar(start, lambda node: node == goal, successors, Maze.manhattan_distance(goal))
+        if solution is None:
+            return None
+
+        abstract_path = node_to_path(solution)
+        path: List[MazeLocation] = [start]
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            if self.cluster_of(a) != self.cluster_of(b):
+                path.append(b)
+            else:
+                path.extend(self._local_path(a, b, self.cluster_of(a))[1:])
+        return path
+
+
+if __name__ == "__main__":
+    maze: Maze = Maze(60, 60, goal=MazeLocation(59, 59))
+    hierarchy = HierarchicalMaze(maze, cluster_size=10)
+    path: Optional[List[MazeLocation]] = hierarchy.find_path()
+    if path is None:
+        print("No solution found!")
+    else:
+        maze.mark(path)
+        print(maze)
+        maze.clear(path)
@@ -1,9 +1,18 @@
 from enum import Enum
-from typing import List, NamedTuple, Callable, Optional, Generic
+from typing import List, NamedTuple, Callable, Optional, Generic, Dict, Tuple, Set, TextIO
 import random
+import mmap
+import struct
+from array import array
+from collections import deque
 from math import sqrt
 from generic_search import Node, Stack, dfs, bfs, node_to_path, astar
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 class Cell(str, Enum):
     EMPTY = " "
     BLOCKED = "X"
@@ -17,6 +26,89 @@ class MazeLocation(NamedTuple):
     column: int 
 
 
+# State of jump point search: a cell and the direction of the jump that reached it, (0, 0) at the
+# start. It has row and column like MazeLocation, so the distance heuristics work on it unchanged.
+class JumpPoint(NamedTuple):
+    row: int
+    column: int
+    dr: int = 0
+    dc: int = 0
+
+
+# one byte per cell for the array-backed mazes, in Cell order (EMPTY = 0, BLOCKED = 1, ...)
+CELL_CODES: Dict[Cell, int] = {cell: code for code, cell in enumerate(Cell)}
+CODE_CHARS: str = "".join(cell.value for cell in Cell)
+CODE_TO_CHAR: bytes = bytes.maketrans(bytes(range(len(CODE_CHARS))), CODE_CHARS.encode())
+
+# binary maze file: magic, rows, columns, start row/column, goal row/column, then one code byte per cell
+MAZE_HEADER = struct.Struct("<4s6I")
+MAZE_MAGIC = b"MAZE"
+
+# entries of the horizontal jump cache besides a column
+NO_JUMP, UNKNOWN_JUMP = -1, -2
+
+# neighbor bitmask bits, and the moves each of the 16 masks allows (same order as Maze.successors)
+DOWN, UP, RIGHT, LEFT = 1, 2, 4, 8
+MASK_MOVES: List[Tuple[Tuple[int, int], ...]] = [
+    tuple(move for bit, move in ((DOWN, (1, 0)), (UP, (-1, 0)), (RIGHT, (0, 1)), (LEFT, (0, -1))) if mask & bit)
+    for mask in range(16)
+]
+
+
+# Result of one reverse breadth-first search from a goal: the distance to the goal and the
+# next cell towards it for every cell, in flat arrays indexed by row * columns + column.
+# Any number of start cells can then be answered by following next hops, without searching.
+class DistanceField:
+
+    def __init__(self, maze: "Maze", goal: MazeLocation) -> None:
+        self.goal = goal
+        self._columns: int = maze._columns
+        size = maze._rows * maze._columns
+        self._distance: array = array("i", [-1]) * size
+        self._next_hop: array = array("i", [-1]) * size
+
+        goal_index = self._index(goal)
+        self._distance[goal_index] = 0
+        frontier = deque([goal])
+        # moves are symmetric, so the neighbors of a cell are also the cells that can step into it
+        while frontier:
+            current = frontier.popleft()
+            current_index = self._index(current)
+            for neighbor in maze.successors(current):
+                neighbor_index = self._index(neighbor)
+                if self._distance[neighbor_index] != -1:
+                    continue
+                self._distance[neighbor_index] = self._distance[current_index] + 1
+                self._next_hop[neighbor_index] = current_index
+                frontier.append(neighbor)
+
+
+    def _index(self, ml: MazeLocation) -> int:
+        return ml.row * self._columns + ml.column
+
+
+    def distance(self, ml: MazeLocation) -> Optional[int]:
+        distance = self._distance[self._index(ml)]
+        return None if distance == -1 else distance
+
+
+    # exact distance to the goal, usable as the heuristic of astar
+    def heuristic(self, ml: MazeLocation) -> float:
+        distance = self._distance[self._index(ml)]
+        return float("inf") if distance == -1 else float(distance)
+
+
+    def path(self, start: MazeLocation) -> Optional[List[MazeLocation]]:
+        index = self._index(start)
+        if self._distance[index] == -1:
+            return None
+        path: List[MazeLocation] = [start]
+        while self._next_hop[index] != -1:
+            index = self._next_hop[index]
+            path.append(MazeLocation(*divmod(index, self._columns)))
+        return path
+
+
 class Maze:
 
     def __init__(self, rows:int = 10, columns:int = 10, start:MazeLocation = MazeLocation(0, 0), goal:MazeLocation = MazeLocation(9, 9), sparseness:float = 0.2) -> None:
@@ -31,6 +123,8 @@ class Maze:
         # Fill in the start and goal locations
         self._grid[start.row][start.column] = Cell.START
         self._grid[goal.row][goal.column] = Cell.GOAL
+        self._distance_fields: Dict[MazeLocation, DistanceField] = {}
+        self._jumps: Dict[Tuple[MazeLocation, int, int], array] = {}
 
 
     def _randomly_fill(self, rows:int, columns:int, sparseness:float) -> None:
@@ -40,16 +134,92 @@ class Maze:
                     self._grid[row][column] = Cell.BLOCKED
 
 
+    def _row_codes(self, row: int) -> bytes:
+        return bytes(CELL_CODES[cell] for cell in self._grid[row])
+
+
+    def _row_chars(self, row: int) -> str:
+        return self._row_codes(row).translate(CODE_TO_CHAR).decode()
+
+
     def __str__(self) -> str:
-        output = ""
-        for row in self._grid:
-            output += "".join([c.value for c in row]) + "\n"
-        
-        return output
+        return "".join(self._row_chars(row) + "\n" for row in range(self._rows))
+
+
+    def _header(self) -> bytes:
+        return MAZE_HEADER.pack(MAZE_MAGIC, self._rows, self._columns, self.start.row, self.start.column, self.goal.row, self.goal.column)
+
+
+    # binary format read by load_maze, written one row at a time
+    def save(self, filename: str) -> None:
+        with open(filename, "wb") as file:
+            file.write(self._header())
+            for row in range(self._rows):
+                file.write(self._row_codes(row))
+
+
+    def to_bytes(self) -> bytes:
+        return self._header() + b"".join(self._row_codes(row) for row in range(self._rows))
+
+
+    # Renders the maze, with path marked like mark() would, straight into file one row at a time.
+    # Unlike str() + mark() it neither builds the whole picture in memory nor touches the grid.
+    def write(self, file: TextIO, path: Optional[List[MazeLocation]] = None) -> None:
+        path_columns: Dict[int, Set[int]] = {}
+        for maze_location in path or []:
+            path_columns.setdefault(maze_location.row, set()).add(maze_location.column)
+        for row in range(self._rows):
+            line = self._row_chars(row)
+            if row in path_columns or row in (self.start.row, self.goal.row):
+                chars = list(line)
+                for column in path_columns.get(row, ()):
+                    chars[column] = Cell.PATH.value
+                if row == self.start.row:
+                    chars[self.start.column] = Cell.START.value
+                if row == self.goal.row:
+                    chars[self.goal.column] = Cell.GOAL.value
+                line = "".join(chars)
+            file.write(line + "\n")
     
 
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+
+    @property
+    def columns(self) -> int:
+        return self._columns
+
+
+    def is_blocked(self, ml: MazeLocation) -> bool:
+        return self._grid[ml.row][ml.column] == Cell.BLOCKED
+
+
     def goal_test(self, ml:MazeLocation) -> bool:
         return ml == self.goal
+
+
+    # goal_test for the JumpPoint states of jump_successors
+    def jump_goal_test(self, point: JumpPoint) -> bool:
+        return point.row == self.goal.row and point.column == self.goal.column
+
+
+    # Cells must be changed through here so cached distance fields and jumps are dropped
+    def set_blocked(self, ml: MazeLocation, blocked: bool = True) -> None:
+        self._grid[ml.row][ml.column] = Cell.BLOCKED if blocked else Cell.EMPTY
+        self._distance_fields.clear()
+        self._jumps.clear()
+
+
+    # Distance field towards goal (self.goal by default), computed once and cached until the grid changes
+    def distance_field(self, goal: Optional[MazeLocation] = None) -> DistanceField:
+        goal = self.goal if goal is None else goal
+        field = self._distance_fields.get(goal)
+        if field is None:
+            field = DistanceField(self, goal)
+            self._distance_fields[goal] = field
+        return field
     
 
     def successors(self, ml:MazeLocation) -> List[MazeLocation]:
@@ -66,6 +236,120 @@ class Maze:
         return locations
     
 
+    # True if the open cell (row, column) can step by (dr, dc)
+    def _can_move(self, row: int, column: int, dr: int, dc: int) -> bool:
+        row += dr
+        column += dc
+        return 0 <= row < self._rows and 0 <= column < self._columns and self._grid[row][column] != Cell.BLOCKED
+
+
+    # Jump point search, adapted to 4-connected moves. Canonical paths go vertically first and turn
+    # horizontally, so a vertical jump stops where a horizontal jump would find something, and a
+    # horizontal jump stops only at the goal or where a vertical turn is forced by a blocked cell.
+    # Jumps are cached per cell (JPS+ style) for the current goal, in one array per direction:
+    # the row or column of the jump point, NO_JUMP, or UNKNOWN_JUMP until a scan passes the cell.
+    # Every cell a scan crosses before its jump point shares that jump point, so each scan fills in
+    # a whole run and no cell is scanned twice in the same direction until the grid changes.
+    def _jump_table(self, dr: int, dc: int) -> array:
+        jumps = self._jumps.get((self.goal, dr, dc))
+        if jumps is None:
+            jumps = array("i", [UNKNOWN_JUMP]) * (self._rows * self._columns)
+            self._jumps[(self.goal, dr, dc)] = jumps
+        return jumps
+
+
+    def _jump_horizontal(self, row: int, column: int, dc: int) -> Optional[MazeLocation]:
+        jumps = self._jump_table(0, dc)
+        base = row * self._columns
+        can_move = self._can_move
+        goal_column = self.goal.column if row == self.goal.row else NO_JUMP
+        crossed: List[int] = [column]
+        result = jumps[base + column]
+        while result == UNKNOWN_JUMP:
+            if not can_move(row, column, 0, dc):
+                result = NO_JUMP
+                break
+            column += dc
+            # the goal, or a vertical move that the previous cell of the row doesn't have
+            if (column == goal_column
+                    or (can_move(row, column, 1, 0) and not can_move(row, column - dc, 1, 0))
+                    or (can_move(row, column, -1, 0) and not can_move(row, column - dc, -1, 0))):
+                result = column
+                break
+            crossed.append(column)
+            result = jumps[base + column]
+
+        for cell in crossed:
+            jumps[base + cell] = result
+        return None if result == NO_JUMP else MazeLocation(row, result)
+
+
+    def _jump_vertical(self, row: int, column: int, dr: int) -> Optional[MazeLocation]:
+        jumps = self._jump_table(dr, 0)
+        goal_row = self.goal.row if column == self.goal.column else NO_JUMP
+        crossed: List[int] = [row]
+        result = jumps[row * self._columns + column]
+        while result == UNKNOWN_JUMP:
+            if not self._can_move(row, column, dr, 0):
+                result = NO_JUMP
+                break
+            row += dr
+            if row == goal_row or self._jump_horizontal(row, column, 1) or self._jump_horizontal(row, column, -1):
+                result = row
+                break
+            crossed.append(row)
+            result = jumps[row * self._columns + column]
+
+        for cell in crossed:
+            jumps[cell * self._columns + column] = result
+        return None if result == NO_JUMP else MazeLocation(result, column)
+
+
+    # Successors for weighted_astar, with jump_goal_test as the goal test: the jump points reachable
+    # in a straight line, with the number of cells in between as the step cost. The start (a
+    # MazeLocation or a JumpPoint without direction) jumps all four ways. A point reached vertically
+    # keeps going and turns both ways horizontally; one reached horizontally keeps going and turns
+    # only where the turn is forced, which is what the horizontal jump stopped for.
+    # Use expand_jump_path on the result.
+    def jump_successors(self, ml: MazeLocation) -> List[Tuple[JumpPoint, float]]:
+        row, column = ml.row, ml.column
+        arrival_dr, arrival_dc = (ml.dr, ml.dc) if isinstance(ml, JumpPoint) else (0, 0)
+        if arrival_dc == 0:
+            verticals: Tuple[int, ...] = (arrival_dr,) if arrival_dr else (1, -1)
+            horizontals: Tuple[int, ...] = (1, -1)
+        else:
+            verticals = tuple(dr for dr in (1, -1) if self._can_move(row, column, dr, 0) and not self._can_move(row, column - arrival_dc, dr, 0))
+            horizontals = (arrival_dc,)
+
+        jumps: List[Tuple[JumpPoint, float]] = []
+        for dr in verticals:
+            jump_point = self._jump_vertical(row, column, dr)
+            if jump_point is not None:
+                jumps.append((JumpPoint(jump_point.row, column, dr, 0), float(abs(jump_point.row - row))))
+        for dc in horizontals:
+            jump_point = self._jump_horizontal(row, column, dc)
+            if jump_point is not None:
+                jumps.append((JumpPoint(row, jump_point.column, 0, dc), float(abs(jump_point.column - column))))
+        return jumps
+
+
+    # fills in the straight runs between consecutive jump points
+    @staticmethod
+    def expand_jump_path(path: List[MazeLocation]) -> List[MazeLocation]:
+        if not path:
+            return []
+        expanded: List[MazeLocation] = [MazeLocation(path[0].row, path[0].column)]
+        for point in path[1:]:
+            target = MazeLocation(point.row, point.column)
+            current = expanded[-1]
+            dr = (target.row > current.row) - (target.row < current.row)
+            dc = (target.column > current.column) - (target.column < current.column)
+            while current != target:
+                current = MazeLocation(current.row + dr, current.column + dc)
+                expanded.append(current)
+        return expanded
+
+
     def mark(self, path: List[MazeLocation]):
         for maze_location in path:
             self._grid[maze_location.row][maze_location.column] = Cell.PATH
@@ -100,6 +384,177 @@ class Maze:
         return distance
 
 
+# Maze stored as a uint8 numpy grid of CELL_CODES instead of lists of Cell members.
+# The blocked cells come from one vectorized random draw, and a per-cell bitmask of open
+# neighbors is precomputed so successors is a table lookup instead of four grid comparisons.
+class ArrayMaze(Maze):
+
+    def __init__(self, rows:int = 10, columns:int = 10, start:MazeLocation = MazeLocation(0, 0), goal:MazeLocation = MazeLocation(9, 9), sparseness:float = 0.2) -> None:
+        if np is None:
+            raise ImportError("ArrayMaze needs numpy")
+        self._rows = rows
+        self._columns = columns
+        self.start = start
+        self.goal = goal
+        # seeded from the random module, so random.seed makes array mazes reproducible like Maze
+        generator = np.random.default_rng(random.getrandbits(64))
+        self._grid = np.empty((rows, columns), dtype=np.uint8)
+        # a few million float32 draws at a time, so the temporaries stay small next to the grid
+        chunk = max(1, (1 << 22) // max(columns, 1))
+        for first in range(0, rows, chunk):
+            blocked = generator.random((min(chunk, rows - first), columns), dtype=np.float32) < sparseness
+            self._grid[first:first + chunk] = blocked.astype(np.uint8) * np.uint8(CELL_CODES[Cell.BLOCKED])
+        self._grid[start.row, start.column] = CELL_CODES[Cell.START]
+        self._grid[goal.row, goal.column] = CELL_CODES[Cell.GOAL]
+        # flat bytearray: indexing it gives plain ints, which is much faster than numpy scalars
+        self._neighbors: bytearray = bytearray(rows * columns)
+        self._neighbor_masks(np.frombuffer(self._neighbors, dtype=np.uint8).reshape(rows, columns))
+        self._distance_fields: Dict[MazeLocation, DistanceField] = {}
+        self._jumps: Dict[Tuple[MazeLocation, int, int], array] = {}
+
+
+    # fills masks (zeroed, rows x columns uint8) with the neighbor bitmask of every cell
+    def _neighbor_masks(self, masks: "np.ndarray") -> None:
+        open_cells = self._grid != CELL_CODES[Cell.BLOCKED]
+        # where= sets the bit in place, without a temporary per direction
+        np.bitwise_or(masks[:-1, :], np.uint8(DOWN), out=masks[:-1, :], where=open_cells[1:, :])
+        np.bitwise_or(masks[1:, :], np.uint8(UP), out=masks[1:, :], where=open_cells[:-1, :])
+        np.bitwise_or(masks[:, :-1], np.uint8(RIGHT), out=masks[:, :-1], where=open_cells[:, 1:])
+        np.bitwise_or(masks[:, 1:], np.uint8(LEFT), out=masks[:, 1:], where=open_cells[:, :-1])
+
+
+    def _row_codes(self, row: int) -> bytes:
+        return self._grid[row].tobytes()
+
+
+    def successors(self, ml:MazeLocation) -> List[MazeLocation]:
+        row, column = ml
+        return [MazeLocation(row + dr, column + dc) for dr, dc in MASK_MOVES[self._neighbors[row * self._columns + column]]]
+
+
+    def is_blocked(self, ml: MazeLocation) -> bool:
+        return self._grid[ml.row, ml.column] == CELL_CODES[Cell.BLOCKED]
+
+
+    def _can_move(self, row: int, column: int, dr: int, dc: int) -> bool:
+        bit = DOWN if dr == 1 else UP if dr == -1 else RIGHT if dc == 1 else LEFT
+        return bool(self._neighbors[row * self._columns + column] & bit)
+
+
+    # only the masks of the four neighbors point at the changed cell, so only those are updated
+    def set_blocked(self, ml: MazeLocation, blocked: bool = True) -> None:
+        row, column = ml
+        self._grid[row, column] = CELL_CODES[Cell.BLOCKED] if blocked else CELL_CODES[Cell.EMPTY]
+        for dr, dc, bit in ((-1, 0, DOWN), (1, 0, UP), (0, -1, RIGHT), (0, 1, LEFT)):
+            neighbor_row, neighbor_column = row + dr, column + dc
+            if 0 <= neighbor_row < self._rows and 0 <= neighbor_column < self._columns:
+                index = neighbor_row * self._columns + neighbor_column
+                if blocked:
+                    self._neighbors[index] &= ~bit & 0xFF
+                else:
+                    self._neighbors[index] |= bit
+        self._distance_fields.clear()
+        self._jumps.clear()
+
+
+    def mark(self, path: List[MazeLocation]):
+        for maze_location in path:
+            self._grid[maze_location.row, maze_location.column] = CELL_CODES[Cell.PATH]
+
+        self._grid[self.start.row, self.start.column] = CELL_CODES[Cell.START]
+        self._grid[self.goal.row, self.goal.column] = CELL_CODES[Cell.GOAL]
+
+
+    def clear(self, path: List[MazeLocation]):
+        for maze_location in path:
+            self._grid[maze_location.row, maze_location.column] = CELL_CODES[Cell.EMPTY]
+
+        self._grid[self.start.row, self.start.column] = CELL_CODES[Cell.START]
+        self._grid[self.goal.row, self.goal.column] = CELL_CODES[Cell.GOAL]
+
+
+# Maze over a flat buffer of code bytes, one per cell, such as a memory-mapped maze file.
+# Nothing is read up front: pages of the grid are only loaded when cells are looked at.
+# mark, clear and set_blocked need a writable buffer.
+class MappedMaze(Maze):
+
+    def __init__(self, cells, rows: int, columns: int, start: MazeLocation, goal: MazeLocation, offset: int = 0) -> None:
+        self._cells = cells
+        self._offset = offset
+        self._rows = rows
+        self._columns = columns
+        self.start = start
+        self.goal = goal
+        self._distance_fields: Dict[MazeLocation, DistanceField] = {}
+        self._jumps: Dict[Tuple[MazeLocation, int, int], array] = {}
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MappedMaze":
+        magic, rows, columns, start_row, start_column, goal_row, goal_column = MAZE_HEADER.unpack_from(data)
+        if magic != MAZE_MAGIC:
+            raise ValueError("Not a maze file")
+        return cls(data, rows, columns, MazeLocation(start_row, start_column), MazeLocation(goal_row, goal_column), MAZE_HEADER.size)
+
+
+    def _code(self, row: int, column: int) -> int:
+        return self._cells[self._offset + row * self._columns + column]
+
+
+    def _set_code(self, ml: MazeLocation, code: int) -> None:
+        self._cells[self._offset + ml.row * self._columns + ml.column] = code
+
+
+    def _row_codes(self, row: int) -> bytes:
+        begin = self._offset + row * self._columns
+        return bytes(self._cells[begin:begin + self._columns])
+
+
+    def is_blocked(self, ml: MazeLocation) -> bool:
+        return self._code(ml.row, ml.column) == CELL_CODES[Cell.BLOCKED]
+
+
+    def _can_move(self, row: int, column: int, dr: int, dc: int) -> bool:
+        row += dr
+        column += dc
+        return 0 <= row < self._rows and 0 <= column < self._columns and self._code(row, column) != CELL_CODES[Cell.BLOCKED]
+
+
+    def successors(self, ml:MazeLocation) -> List[MazeLocation]:
+        row, column = ml
+        return [MazeLocation(row + dr, column + dc) for dr, dc in MASK_MOVES[15] if self._can_move(row, column, dr, dc)]
+
+
+    def set_blocked(self, ml: MazeLocation, blocked: bool = True) -> None:
+        self._set_code(ml, CELL_CODES[Cell.BLOCKED] if blocked else CELL_CODES[Cell.EMPTY])
+        self._distance_fields.clear()
+        self._jumps.clear()
+
+
+    def mark(self, path: List[MazeLocation]):
+        for maze_location in path:
+            self._set_code(maze_location, CELL_CODES[Cell.PATH])
+
+        self._set_code(self.start, CELL_CODES[Cell.START])
+        self._set_code(self.goal, CELL_CODES[Cell.GOAL])
+
+
+    def clear(self, path: List[MazeLocation]):
+        for maze_location in path:
+            self._set_code(maze_location, CELL_CODES[Cell.EMPTY])
+
+        self._set_code(self.start, CELL_CODES[Cell.START])
+        self._set_code(self.goal, CELL_CODES[Cell.GOAL])
+
+
+# Opens a file written by Maze.save through mmap, so even huge mazes open instantly.
+# With writable=False (the default) changes stay in memory (copy-on-write); with True they go to the file.
+def load_maze(filename: str, writable: bool = False) -> MappedMaze:
+    with open(filename, "r+b" if writable else "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY)
+    return MappedMaze.from_bytes(mapped)
+
+
 if __name__ == '__main__':
     maze: Maze = Maze()
     print(maze)
@@ -0,0 +1,67 @@
+import os
+from typing import Iterable, Iterator, List, Optional, Set, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from generic_search import SearchStats, dfs, bfs, astar, weighted_astar, node_to_path
+from maze import Maze, MazeLocation, MappedMaze, load_maze
+
+ALGORITHMS: Tuple[str, ...] = ("dfs", "bfs", "astar", "jps")
+
+MazeId = Union[int, str]
+Result = Tuple[MazeId, Optional[List[MazeLocation]], SearchStats]
+
+
+# Runs in the worker process. payload is either the name of a maze file or the bytes of Maze.to_bytes,
+# which pickle much smaller than a grid of Cell members.
+def _solve(maze_id: MazeId, payload: Union[str, bytes], algorithm: str) -> Result:
+    maze: Maze = load_maze(payload) if isinstance(payload, str) else MappedMaze.from_bytes(payload)
+    stats = SearchStats()
+    if algorithm == "dfs":
+        solution = dfs(maze.start, maze.successors, maze.goal_test, stats)
+    elif algorithm == "bfs":
+        solution = bfs(maze.start, maze.successors, maze.goal_test, stats)
+    elif algorithm == "astar":
+        solution = astar(maze.start, maze.goal_test, maze.successors, Maze.manhattan_distance(maze.goal), stats)
+    else:
+        solution = weighted_astar(maze.start, maze.jump_goal_test, maze.jump_successors, Maze.manhattan_distance(maze.goal), stats)
+
+    if solution is None:
+        return maze_id, None, stats
+    path = node_to_path(solution)
+    return maze_id, Maze.expand_jump_path(path) if algorithm == "jps" else path, stats
+
+
+# Solves independent mazes on a process pool and yields (maze_id, path, stats) as each one finishes,
+# so results come back out of order. mazes holds Maze objects (their id is their position) or names
+# of files written by Maze.save (their id is the name). At most max_pending mazes are in flight,
+# so a long input iterable is never read ahead completely.
+def solve_mazes(mazes: Iterable[Union[Maze, str]], algorithm: str = "astar", workers: Optional[int] = None, max_pending: Optional[int] = None) -> Iterator[Result]:
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"algorithm must be one of {ALGORITHMS}")
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 4 * workers
+    with ProcessPoolExecutor(workers) as executor:
+        pending: Set[Future] = set()
+        for position, maze in enumerate(mazes):
+            if isinstance(maze, str):
+                pending.add(executor.submit(_solve, maze, maze, algorithm))
+            else:
+                pending.add(executor.submit(_solve, position, maze.to_bytes(), algorithm))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+if __name__ == "__main__":
+    batch: List[Maze] = [Maze(50, 50, goal=MazeLocation(49, 49)) for _ in range(20)]
+    for maze_id, path, stats in solve_mazes(batch, "astar"):
+        if path is None:
+            print(f"maze {maze_id}: no solution found ({stats.expanded} nodes expanded)")
+        else:
+            print(f"maze {maze_id}: path of {len(path)} cells ({stats.expanded} nodes expanded)")
@@ -1,5 +1,5 @@
 from csp import CSP, Constraint
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple, Iterable
 
 
 class QueensConstraint(Constraint[int, int]):
@@ -17,6 +17,35 @@ class QueensConstraint(Constraint[int, int]):
                     if abs(q1r - q2r) == abs(q1c - q2c):
                         return False 
         return True
+
+    # the queens the search has placed on each row and diagonal, so check is O(1)
+    def reset(self) -> None:
+        self._lines: Dict[Tuple[str, int], Set[int]] = {}
+
+    def _through(self, column: int, row: int) -> List[Tuple[str, int]]:
+        return [("row", row), ("diagonal", row - column), ("anti-diagonal", row + column)]
+
+    def check(self, column: int, row: int, assignment: Dict[int, int]) -> bool:
+        return not any(self._lines.get(line) for line in self._through(column, row))
+
+    def assign(self, column: int, row: int) -> None:
+        for line in self._through(column, row):
+            self._lines.setdefault(line, set()).add(column)
+
+    def unassign(self, column: int, row: int) -> None:
+        for line in self._through(column, row):
+            self._lines[line].discard(column)
+
+    # one conflict per other queen attacking the square
+    def conflicts(self, column: int, row: int, assignment: Dict[int, int]) -> int:
+        count = 0
+        for line in self._through(column, row):
+            queens = self._lines.get(line, ())
+            count += len(queens) - (column in queens)
+        return count
+
+    def neighbors(self, column: int, row: int) -> Iterable[int]:
+        return [other for line in self._through(column, row) for other in self._lines.get(line, ())]
     
 
 if __name__ == "__main__":
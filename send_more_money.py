@@ -1,5 +1,5 @@
 from csp import CSP, Constraint
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 
 class SendMoreMoneyConstraint(Constraint[str, int]):
@@ -26,6 +26,23 @@ class SendMoreMoneyConstraint(Constraint[str, int]):
             money: int = m * 10000 + o * 1000 + n * 100 + e * 10 + y
             return send + more == money
         return True
+
+    # the digits already used by the search; the sum is only worked out for the last letter
+    def reset(self) -> None:
+        self._used: Set[int] = set()
+
+    def check(self, letter: str, digit: int, assignment: Dict[str, int]) -> bool:
+        if digit in self._used:
+            return False
+        if len(self._used) + 1 == len(self.letters):
+            return self.satisfied(assignment)
+        return True
+
+    def assign(self, letter: str, digit: int) -> None:
+        self._used.add(digit)
+
+    def unassign(self, letter: str, digit: int) -> None:
+        self._used.discard(digit)
     
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+import unittest
+import itertools
+import random
+import time
+from typing import Dict, List
+from csp import CSP, AllDifferent, Inference, StaticOrder, MinimumRemainingValues, DomWDeg, natural_order, least_constraining_value
+from queens import QueensConstraint
+
+
+def queens_csp(n: int) -> CSP[int, int]:
+    columns: List[int] = list(range(1, n + 1))
+    rows: Dict[int, List[int]] = {column: list(range(1, n + 1)) for column in columns}
+    csp: CSP[int, int] = CSP(columns, rows)
+    csp.add_constraint(QueensConstraint(columns))
+    return csp
+
+
+# the values of every variable that appear in at least one all-different assignment
+def brute_force_supports(variables: List[int], domains: Dict[int, List[int]]) -> Dict[int, List[int]]:
+    supports: Dict[int, set] = {variable: set() for variable in variables}
+    for values in itertools.product(*(domains[variable] for variable in variables)):
+        if len(set(values)) == len(values):
+            for variable, value in zip(variables, values):
+                supports[variable].add(value)
+    return {variable: sorted(values) for variable, values in supports.items()}
+
+
+class TestAllDifferent(unittest.TestCase):
+
+    def test_filter_matches_brute_force(self):
+        rng = random.Random(1)
+        for _ in range(500):
+            variables = list(range(rng.randint(1, 6)))
+            domains = {variable: sorted(rng.sample(range(1, 8), rng.randint(1, 4))) for variable in variables}
+            expected = brute_force_supports(variables, domains)
+            kept = {variable: sorted(values) for variable, values in AllDifferent(variables).propagate(domains, {})}
+            if any(not values for values in expected.values()):
+                self.assertTrue(any(not values for values in kept.values()))
+            else:
+                self.assertEqual(kept, expected)
+
+
+    def test_wipeout_when_all_assigned(self):
+        csp: CSP[int, int] = CSP([0, 1], {0: [1], 1: [1]})
+        csp.add_constraint(AllDifferent([0, 1]))
+        self.assertFalse(csp.ac3(assignment={0: 1, 1: 1}))
+
+
+    def test_ac3_prunes_domains(self):
+        domains = {0: [1, 2], 1: [1, 2], 2: [1, 2, 3]}
+        csp: CSP[int, int] = CSP([0, 1, 2], dict(domains))
+        csp.add_constraint(AllDifferent([0, 1, 2]))
+        self.assertTrue(csp.ac3())
+        self.assertEqual(csp.domains[2], [3])
+
+
+class TestQueensCount(unittest.TestCase):
+
+    def test_eight_queens_solutions(self):
+        for inference in Inference:
+            for variable_order in (StaticOrder, MinimumRemainingValues, DomWDeg):
+                for value_order in (natural_order, least_constraining_value):
+                    with self.subTest(inference=inference, variable_order=variable_order.__name__, value_order=value_order.__name__):
+                        count = queens_csp(8).count_solutions(inference=inference, variable_order=variable_order(), value_order=value_order)
+                        self.assertEqual(count, 92)
+
+
+    def test_degree_tie_break(self):
+        self.assertEqual(queens_csp(8).count_solutions(inference=Inference.FORWARD_CHECKING, variable_order=MinimumRemainingValues(degree=True)), 92)
+
+
+    def test_no_solution(self):
+        self.assertIsNone(queens_csp(3).backtracking_search(inference=Inference.MAC))
+
+
+    def test_inconsistent_seed(self):
+        for inference in Inference:
+            with self.subTest(inference=inference):
+                csp = queens_csp(4)
+                self.assertIsNone(csp.backtracking_search(assignment={1: 1, 2: 1}, inference=inference))
+                self.assertEqual(csp.count_solutions(assignment={1: 1, 2: 1}, inference=inference), 0)
+                self.assertEqual(csp.backtracking_search(assignment={1: 2}, inference=inference), {1: 2, 2: 4, 3: 1, 4: 3})
+
+
+
+class TestMinConflicts(unittest.TestCase):
+
+    def test_solves_queens(self):
+        csp = queens_csp(100)
+        assignment, count = csp.min_conflicts(seed=1)
+        self.assertEqual(count, 0)
+        self.assertTrue(csp.constraints[1][0].satisfied(assignment))
+
+
+    def test_deadline_covers_greedy_start(self):
+        csp = queens_csp(3000)
+        started = time.perf_counter()
+        assignment, _ = csp.min_conflicts(max_time=0.2, seed=1)
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertEqual(len(assignment), 3000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+from typing import List
+from generic_search import bfs, parallel_bfs, node_to_path
+
+
+# a grid graph of side SIDE with states numbered row by row
+SIDE = 30
+
+
+def grid_successors(state: int) -> List[int]:
+    row, column = divmod(state, SIDE)
+    children: List[int] = []
+    if row > 0:
+        children.append(state - SIDE)
+    if row < SIDE - 1:
+        children.append(state + SIDE)
+    if column > 0:
+        children.append(state - 1)
+    if column < SIDE - 1:
+        children.append(state + 1)
+    return children
+
+
+def is_far_corner(state: int) -> bool:
+    return state == SIDE * SIDE - 1
+
+
+def never(state: int) -> bool:
+    return False
+
+
+def failing_successors(state: int) -> List[int]:
+    if state == 5:
+        raise ValueError("no successors for 5")
+    return grid_successors(state)
+
+
+def dying_successors(state: int) -> List[int]:
+    if state == 5:
+        os._exit(3)
+    return grid_successors(state)
+
+
+class TestParallelBFS(unittest.TestCase):
+
+    def test_path_as_short_as_bfs(self):
+        expected = node_to_path(bfs(0, grid_successors, is_far_corner))
+        for workers in (1, 2, 3):
+            with self.subTest(workers=workers):
+                path = node_to_path(parallel_bfs(0, grid_successors, is_far_corner, workers=workers))
+                self.assertEqual(len(path), len(expected))
+                self.assertEqual(path[0], 0)
+                self.assertEqual(path[-1], SIDE * SIDE - 1)
+                for state, child in zip(path, path[1:]):
+                    self.assertIn(child, grid_successors(state))
+
+
+    def test_start_is_goal(self):
+        self.assertEqual(node_to_path(parallel_bfs(7, grid_successors, lambda state: state == 7, workers=2)), [7])
+
+
+    def test_no_goal(self):
+        self.assertIsNone(parallel_bfs(0, grid_successors, never, workers=3))
+
+
+    def test_worker_error_is_raised(self):
+        with self.assertRaisesRegex(ValueError, "no successors for 5"):
+            parallel_bfs(0, failing_successors, never, workers=3)
+
+
+    def test_dead_worker_is_reported(self):
+        with self.assertRaisesRegex(RuntimeError, "exited with code 3"):
+            parallel_bfs(0, dying_successors, never, workers=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
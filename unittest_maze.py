@@ -0,0 +1,105 @@
+import unittest
+import random
+from typing import List, Optional
+from generic_search import bfs, astar, weighted_astar, node_to_path
+from maze import Maze, ArrayMaze, MappedMaze, MazeLocation, JumpPoint, np
+
+
+def shortest_length(maze: Maze) -> Optional[int]:
+    solution = bfs(maze.start, maze.successors, maze.goal_test)
+    return None if solution is None else len(node_to_path(solution))
+
+
+def jump_path(maze: Maze) -> Optional[List[MazeLocation]]:
+    solution = weighted_astar(maze.start, maze.jump_goal_test, maze.jump_successors, Maze.manhattan_distance(maze.goal))
+    return None if solution is None else Maze.expand_jump_path(node_to_path(solution))
+
+
+def random_mazes(maze_type=Maze, count: int = 40):
+    rng = random.Random(3)
+    for seed in range(count):
+        random.seed(seed)
+        rows, columns = rng.randint(2, 40), rng.randint(2, 40)
+        start = MazeLocation(rng.randrange(rows), rng.randrange(columns))
+        goal = MazeLocation(rng.randrange(rows), rng.randrange(columns))
+        yield maze_type(rows, columns, start, goal, rng.choice((0.0, 0.05, 0.1, 0.2, 0.3, 0.4)))
+
+
+class TestJumpPointSearch(unittest.TestCase):
+
+    def assertValidPath(self, maze: Maze, path: Optional[List[MazeLocation]], length: Optional[int]):
+        if length is None:
+            self.assertIsNone(path)
+            return
+        self.assertEqual(len(path), length)
+        self.assertEqual(path[0], maze.start)
+        self.assertEqual(path[-1], maze.goal)
+        for current, following in zip(path, path[1:]):
+            self.assertIn(following, maze.successors(current))
+
+
+    def test_matches_bfs_and_astar(self):
+        for maze in random_mazes():
+            with self.subTest(maze=str(maze)):
+                length = shortest_length(maze)
+                self.assertValidPath(maze, jump_path(maze), length)
+                solution = astar(maze.start, maze.goal_test, maze.successors, Maze.manhattan_distance(maze.goal))
+                self.assertEqual(None if solution is None else len(node_to_path(solution)), length)
+
+
+    def test_after_set_blocked(self):
+        for maze in random_mazes(count=20):
+            for _ in range(5):
+                path = jump_path(maze)
+                if path is None or len(path) < 3:
+                    break
+                maze.set_blocked(path[len(path) // 2])
+                with self.subTest(maze=str(maze)):
+                    self.assertValidPath(maze, jump_path(maze), shortest_length(maze))
+            # and open them again
+            for row in range(maze.rows):
+                for column in range(maze.columns):
+                    if maze.is_blocked(MazeLocation(row, column)):
+                        maze.set_blocked(MazeLocation(row, column), False)
+            with self.subTest(maze=str(maze)):
+                self.assertValidPath(maze, jump_path(maze), shortest_length(maze))
+
+
+    def test_goal_change(self):
+        for maze in random_mazes(count=20):
+            jump_path(maze)
+            maze.goal = maze.start
+            maze.start = MazeLocation(0, 0)
+            if maze.is_blocked(maze.start):
+                continue
+            with self.subTest(maze=str(maze)):
+                self.assertValidPath(maze, jump_path(maze), shortest_length(maze))
+
+
+    # the cached jumps must not depend on the order the cells were asked in
+    def test_cache_matches_fresh_scans(self):
+        for maze in random_mazes(count=15):
+            cells = [MazeLocation(row, column) for row in range(maze.rows) for column in range(maze.columns) if not maze.is_blocked(MazeLocation(row, column))]
+            states = [JumpPoint(cell.row, cell.column, dr, dc) for cell in cells for dr, dc in ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1))]
+            cached = {state: maze.jump_successors(state) for state in reversed(states)}
+            for state in states:
+                maze._jumps.clear()
+                self.assertEqual(maze.jump_successors(state), cached[state])
+
+
+    def test_mapped_maze(self):
+        for maze in random_mazes(count=10):
+            mapped = MappedMaze.from_bytes(bytearray(maze.to_bytes()))
+            with self.subTest(maze=str(maze)):
+                self.assertValidPath(mapped, jump_path(mapped), shortest_length(maze))
+
+
+    @unittest.skipIf(np is None, "ArrayMaze needs numpy")
+    def test_array_maze(self):
+        for maze in random_mazes(ArrayMaze, count=20):
+            with self.subTest(maze=str(maze)):
+                self.assertValidPath(maze, jump_path(maze), shortest_length(maze))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,4 @@
-from typing import NamedTuple, List, Dict, Optional
+from typing import NamedTuple, List, Dict, Optional, Set
 from random import choice 
 from string import ascii_uppercase
 from csp import CSP, Constraint 
@@ -54,6 +54,19 @@ class WordSearchConstraint(Constraint[str, List[GridLocation]]):
 
         # if there is any element duplicated, them means two works are occupying the same space, so the state is invalid as solution
         return len(set(all_locations)) == len(all_locations)
+
+    # the cells taken by the words the search has placed
+    def reset(self) -> None:
+        self._occupied: Set[GridLocation] = set()
+
+    def check(self, word: str, locations: List[GridLocation], assignment: Dict[str, List[GridLocation]]) -> bool:
+        return self._occupied.isdisjoint(locations)
+
+    def assign(self, word: str, locations: List[GridLocation]) -> None:
+        self._occupied.update(locations)
+
+    def unassign(self, word: str, locations: List[GridLocation]) -> None:
+        self._occupied.difference_update(locations)
     
 
 if __name__ == "__main__":